@@ -0,0 +1,103 @@
+"""Measure connection pool sizing and pre-warming against a local Bedrock stand-in.
+
+Each simulated query fans out parallel invoke_model calls, like the
+reranker does. The stand-in server adds a fixed delay per request and a
+one-off delay per new connection to emulate TLS handshakes, so pool
+exhaustion and cold connections show up in tail latency.
+
+Usage:
+	python benchmarks/client_pool.py [queries] [fan_out]
+"""
+
+import concurrent.futures
+import http.server
+import os
+import statistics
+import sys
+import threading
+import time
+
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+sys.path.insert(
+	0,
+	os.path.join(os.path.dirname(__file__), '..', 'main', 'layers', 'rag_core_lib'),
+)
+
+from clients.factory import get_client, prewarm_client  # noqa: E402
+
+REQUEST_DELAY = 0.02
+HANDSHAKE_DELAY = 0.05
+
+
+class _FakeBedrockHandler(http.server.BaseHTTPRequestHandler):
+	protocol_version = 'HTTP/1.1'
+	disable_nagle_algorithm = True
+
+	def setup(self):
+		super().setup()
+		time.sleep(HANDSHAKE_DELAY)
+
+	def do_POST(self):  # noqa: N802
+		self.rfile.read(int(self.headers.get('Content-Length', 0)))
+		time.sleep(REQUEST_DELAY)
+		body = b'{"content": [{"text": "7"}]}'
+		self.send_response(200)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+
+def _run(endpoint: str, pool_size: int, prewarm: bool, queries: int, fan_out: int):
+	client = get_client('bedrock-runtime', 'us-east-1', pool_size, endpoint)
+	if prewarm:
+		prewarm_client(client, pool_size)
+
+	def _call(_):
+		start = time.perf_counter()
+		response = client.invoke_model(modelId='fake', body='{}')
+		response['body'].read()
+		return time.perf_counter() - start
+
+	call_latencies = []
+	query_latencies = []
+	with concurrent.futures.ThreadPoolExecutor(max_workers=fan_out) as executor:
+		for _ in range(queries):
+			start = time.perf_counter()
+			call_latencies.extend(executor.map(_call, range(fan_out)))
+			query_latencies.append(time.perf_counter() - start)
+	return call_latencies, query_latencies
+
+
+def _ms(values: list[float], q: int) -> float:
+	return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+def main():
+	"""Run each configuration against a fresh server and print percentiles."""
+	queries = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+	fan_out = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+	print(f'{queries} queries x {fan_out} parallel calls')
+	print(f'{"configuration":>28} {"call p50":>9} {"call p99":>9} {"query p99":>10}')
+	for pool_size, prewarm in ((10, False), (fan_out, False), (fan_out, True)):
+		server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _FakeBedrockHandler)
+		threading.Thread(target=server.serve_forever, daemon=True).start()
+		endpoint = f'http://127.0.0.1:{server.server_address[1]}'
+
+		calls, query_times = _run(endpoint, pool_size, prewarm, queries, fan_out)
+		server.shutdown()
+
+		name = f'pool={pool_size}{" +prewarm" if prewarm else ""}'
+		print(
+			f'{name:>28} {_ms(calls, 50):>7.1f}ms {_ms(calls, 99):>7.1f}ms '
+			f'{_ms(query_times, 99):>8.1f}ms'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,97 @@
+"""Offline recall harness for vector-only versus hybrid (BM25 + RRF) retrieval.
+
+Reports recall@k for each candidate count so topK can be lowered only
+where hybrid retrieval keeps recall.
+
+Corpus lines are {"key": ..., "text": ...} and query lines are
+{"query": ..., "relevant": [key, ...]}. Without --bedrock, embeddings are
+hashed character trigrams: a crude, offline stand-in that is only useful
+for exercising the harness, not for tuning.
+
+Usage:
+	python benchmarks/hybrid_recall.py corpus.jsonl queries.jsonl [--bedrock]
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+os.environ.setdefault('VECTOR_BUCKET_NAME', 'benchmark-vector-bucket')
+os.environ.setdefault('VECTOR_INDEX_NAME', 'benchmark-vector-index')
+sys.path.insert(
+	0,
+	os.path.join(os.path.dirname(__file__), '..', 'main', 'layers', 'rag_core_lib'),
+)
+
+from rag_engine import LexicalIndex, clean_data, reciprocal_rank_fusion  # noqa: E402
+
+DIMENSIONS = 1024
+CUTOFFS = (1, 3, 5, 10, 20)
+
+
+def _hashed_embedding(text: str) -> list[float]:
+	vector = np.zeros(DIMENSIONS, dtype=np.float32)
+	for i in range(len(text) - 2):
+		digest = hashlib.md5(text[i : i + 3].encode('utf-8')).digest()
+		vector[int.from_bytes(digest[:4], 'little') % DIMENSIONS] += 1.0
+	return vector.tolist()
+
+
+def _read_jsonl(path: str) -> list[dict]:
+	with open(path) as f:
+		return [json.loads(line) for line in f if line.strip()]
+
+
+def _recall(ranked: list[str], relevant: set[str], k: int) -> float:
+	return len(relevant.intersection(ranked[:k])) / len(relevant)
+
+
+def main():
+	"""Compute and print recall@k for both retrieval paths."""
+	args = [a for a in sys.argv[1:] if not a.startswith('--')]
+	if len(args) != 2:
+		sys.exit(__doc__)
+
+	if '--bedrock' in sys.argv:
+		from rag_engine import get_embedding as embed
+	else:
+		embed = _hashed_embedding
+
+	corpus = _read_jsonl(args[0])
+	queries = _read_jsonl(args[1])
+
+	keys = [doc['key'] for doc in corpus]
+	index = LexicalIndex()
+	for doc in corpus:
+		index.add(doc['key'], clean_data(doc['text']))
+
+	embeddings = np.asarray([embed(clean_data(d['text'])) for d in corpus], np.float32)
+	embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+
+	totals = {(path, k): 0.0 for path in ('vector', 'hybrid') for k in CUTOFFS}
+	for item in queries:
+		relevant = set(item['relevant'])
+		query_embedding = np.asarray(embed(item['query']), np.float32)
+		similarity = embeddings @ (query_embedding / np.linalg.norm(query_embedding))
+		for k in CUTOFFS:
+			vector_ranked = [keys[i] for i in np.argsort(-similarity)[:k]]
+			lexical_ranked = [key for key, _ in index.search(item['query'], k)]
+			hybrid_ranked = [
+				key for key, _ in reciprocal_rank_fusion([vector_ranked, lexical_ranked])
+			]
+			totals['vector', k] += _recall(vector_ranked, relevant, k)
+			totals['hybrid', k] += _recall(hybrid_ranked, relevant, k)
+
+	print(f'{len(corpus)} chunks, {len(queries)} queries')
+	print(f'{"topK":>6} {"vector":>8} {"hybrid":>8}')
+	for k in CUTOFFS:
+		vector = totals['vector', k] / len(queries)
+		hybrid = totals['hybrid', k] / len(queries)
+		print(f'{k:>6} {vector:>8.3f} {hybrid:>8.3f}')
+
+
+if __name__ == '__main__':
+	main()
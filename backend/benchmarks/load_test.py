@@ -0,0 +1,458 @@
+"""Simulate concurrent query handler invocations against account quotas.
+
+Each simulated resident sends questions through the query handler in a
+loop. Invocations run in simulated Lambda containers: private copies of
+the handler and the layer packages, so each container has its own client
+cache, connection pools and retry quota. A container serves one
+invocation at a time. When none is idle a new one is started (a cold
+start), up to the concurrency limit, beyond which invocations are
+rejected as Lambda would throttle them.
+
+A stand-in for Bedrock and S3 Vectors runs in a separate process. It
+enforces a requests-per-minute quota per Bedrock model, shared by all
+containers, and answers requests over quota with ThrottlingException.
+
+The report shows, per interval of completed invocations:
+	goodput: invocations per second answered with no failed AWS call
+	degraded: invocations answered although some calls failed after all
+		retries, e.g. chunks the reranker scored 0 after being throttled
+	throttled: share of Bedrock requests rejected by the quota
+	amplification: HTTP requests per invocation, relative to one
+		invocation without a quota
+	p50/p95/p99: invocation latency, including the init of cold starts
+
+Cold starts are initialized one at a time in this process; only their own
+init time counts towards latency.
+
+Usage:
+	python benchmarks/load_test.py [--users N] [--duration S] [--rpm N]
+		[--concurrency N] [--provisioned N] [--think S] [--interval S]
+		[--max-attempts N] [--retry-mode standard|adaptive|legacy]
+"""
+
+import contextlib
+import http.server
+import importlib.util
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+os.environ.setdefault('VECTOR_BUCKET_NAME', 'benchmark-vector-bucket')
+os.environ.setdefault('VECTOR_INDEX_NAME', 'benchmark-vector-index')
+sys.path.insert(
+	0,
+	os.path.join(os.path.dirname(__file__), '..', 'main', 'layers', 'rag_core_lib'),
+)
+
+HANDLER_PATH = os.path.join(
+	os.path.dirname(__file__), '..', 'main', 'handlers', 'query', 'handler.py'
+)
+LAYER_PACKAGES = ('clients', 'models', 'rag_engine')
+
+# Median latencies of the stand-in, in seconds; each request varies around it.
+EMBEDDING_DELAY = 0.05
+RERANK_DELAY = 0.3
+GENERATION_DELAY = 1.5
+VECTOR_QUERY_DELAY = 0.03
+
+# Seconds a resident waits before asking again after Lambda rejected them.
+REJECTED_BACKOFF = 1.0
+
+QUESTIONS = (
+	'What are the pool hours?',
+	'Can I build a fence taller than six feet?',
+	'How much is the guest fee?',
+	'Where can visitors park overnight?',
+	'Do I need approval to paint my front door?',
+)
+
+_EMBEDDING = json.dumps({'embedding': [0.01] * 1024, 'inputTextTokenCount': 8})
+_SCORE = json.dumps({'content': [{'type': 'text', 'text': '7'}]})
+_ANSWER = json.dumps({'content': [{'type': 'text', 'text': 'The pool opens at 9am.'}]})
+
+
+class _Quota:
+	"""A token bucket refilled at rpm / 60 requests a second."""
+
+	def __init__(self, rpm: int):
+		self.rate = rpm / 60
+		# Allow a burst of one second's worth of requests.
+		self.capacity = max(1.0, self.rate)
+		self.tokens = self.capacity
+		self.updated = time.monotonic()
+
+	def take(self) -> bool:
+		now = time.monotonic()
+		self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+		self.updated = now
+		if self.tokens < 1:
+			return False
+		self.tokens -= 1
+		return True
+
+
+class _FakeAwsHandler(http.server.BaseHTTPRequestHandler):
+	protocol_version = 'HTTP/1.1'
+	disable_nagle_algorithm = True
+
+	# Shared by all connections: the RPM per model (0 is unlimited), each
+	# model's quota, and Bedrock [requests, throttled] per second since reset.
+	lock = threading.Lock()
+	rpm = 0
+	quotas = {}
+	started = time.time()
+	seconds = {}
+
+	def _send(self, status: int, body: str, error: str | None = None):
+		payload = body.encode('utf-8')
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(payload)))
+		if error:
+			self.send_header('x-amzn-ErrorType', error)
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def _admit(self, model_id: str) -> bool:
+		cls = type(self)
+		with cls.lock:
+			quota = cls.quotas.get(model_id)
+			if quota is None and cls.rpm:
+				quota = cls.quotas[model_id] = _Quota(cls.rpm)
+			admitted = quota is None or quota.take()
+			counts = cls.seconds.setdefault(int(time.time() - cls.started), [0, 0])
+			counts[0] += 1
+			counts[1] += not admitted
+		return admitted
+
+	def _invoke_model(self, model_id: str, request: dict):
+		if not self._admit(model_id):
+			self._send(
+				429,
+				json.dumps({'message': 'Too many requests, please wait.'}),
+				error='ThrottlingException',
+			)
+			return
+		if 'inputText' in request:
+			delay, body = EMBEDDING_DELAY, _EMBEDDING
+		elif request.get('max_tokens', 0) <= 10:
+			delay, body = RERANK_DELAY, _SCORE
+		else:
+			delay, body = GENERATION_DELAY, _ANSWER
+		time.sleep(_jitter(delay))
+		self._send(200, body)
+
+	def _query_vectors(self, request: dict):
+		vectors = [
+			{
+				'key': f'chunk-{i}',
+				'distance': 0.2 + i / 100,
+				'metadata': {'chunk_text': f'Section {i}: pool hours are 9am to 9pm.'},
+			}
+			for i in range(request.get('topK', 20))
+		]
+		time.sleep(_jitter(VECTOR_QUERY_DELAY))
+		self._send(200, json.dumps({'vectors': vectors, 'distanceMetric': 'cosine'}))
+
+	def do_POST(self):  # noqa: N802
+		raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+		request = json.loads(raw) if raw else {}
+		path = urllib.parse.unquote(self.path)
+
+		if path == '/_reset':
+			cls = type(self)
+			with cls.lock:
+				cls.rpm = request['rpm']
+				cls.quotas = {}
+				cls.started = time.time()
+				cls.seconds = {}
+			self._send(200, '{}')
+		elif path.startswith('/model/'):
+			self._invoke_model(path[len('/model/') : -len('/invoke')], request)
+		elif path == '/QueryVectors':
+			self._query_vectors(request)
+		elif path == '/GetVectors':
+			vectors = [
+				{'key': key, 'data': {'float32': [0.01] * 1024}}
+				for key in request['keys']
+			]
+			self._send(200, json.dumps({'vectors': vectors}))
+		else:
+			self._send(200, json.dumps({'vectors': []}))
+
+	def do_GET(self):  # noqa: N802
+		with self.lock:
+			self._send(200, json.dumps(self.seconds))
+
+	def log_message(self, *args):
+		pass
+
+
+class _FakeAwsServer(http.server.ThreadingHTTPServer):
+	daemon_threads = True
+	# Every container opens its connections at once on a cold start.
+	request_queue_size = 1024
+
+
+def _jitter(median: float) -> float:
+	return random.lognormvariate(math.log(median), 0.4)
+
+
+def _serve(connection):
+	server = _FakeAwsServer(('127.0.0.1', 0), _FakeAwsHandler)
+	connection.send(server.server_address[1])
+	server.serve_forever()
+
+
+def _control(endpoint: str, path: str, request: dict | None = None):
+	data = None if request is None else json.dumps(request).encode('utf-8')
+	with urllib.request.urlopen(endpoint + path, data=data) as response:
+		return json.loads(response.read())
+
+
+_IMPORT_LOCK = threading.Lock()
+_CONTAINER_IDS = itertools.count()
+
+
+class _Container:
+	"""A simulated Lambda container with its own copy of the handler."""
+
+	def __init__(self):
+		with _IMPORT_LOCK:
+			start = time.perf_counter()
+			try:
+				# A fresh import of the handler re-imports the layer packages,
+				# giving this container its own module state and clients.
+				spec = importlib.util.spec_from_file_location(
+					f'query_handler_{next(_CONTAINER_IDS)}', HANDLER_PATH
+				)
+				self.handler = importlib.util.module_from_spec(spec)
+				spec.loader.exec_module(self.handler)
+				clients = sys.modules['clients.factory']._CLIENT_CACHE.values()
+			finally:
+				for name in list(sys.modules):
+					if name.split('.')[0] in LAYER_PACKAGES:
+						del sys.modules[name]
+			self.init_seconds = time.perf_counter() - start
+
+		self._lock = threading.Lock()
+		self.calls = self.attempts = self.failures = 0
+		for client in clients:
+			client.meta.events.register('before-call', self._on_call)
+			client.meta.events.register('before-send', self._on_send)
+			client.meta.events.register('after-call', self._on_response)
+			client.meta.events.register('after-call-error', self._on_error)
+
+	# Handlers must return None, or botocore takes the value as the response.
+	def _on_call(self, **kwargs):
+		with self._lock:
+			self.calls += 1
+
+	def _on_send(self, **kwargs):
+		with self._lock:
+			self.attempts += 1
+
+	def _on_response(self, http_response, **kwargs):
+		if http_response.status_code >= 300:
+			self._on_error()
+
+	def _on_error(self, **kwargs):
+		with self._lock:
+			self.failures += 1
+
+	def invoke(self, event: dict) -> dict:
+		"""Run one invocation and return the handler's response."""
+		with self._lock:
+			self.calls = self.attempts = self.failures = 0
+		return self.handler.lambda_handler(event, None)
+
+
+class _ContainerPool:
+	"""Hand out idle containers, starting new ones up to a limit."""
+
+	def __init__(self, limit: int, provisioned: int):
+		self._limit = limit
+		self._idle = [_Container() for _ in range(provisioned)]
+		self._started = provisioned
+		self._lock = threading.Lock()
+
+	def acquire(self) -> tuple[_Container | None, bool]:
+		"""Return an idle or new container and whether it is a cold start."""
+		with self._lock:
+			if self._idle:
+				return self._idle.pop(), False
+			if self._started >= self._limit:
+				return None, False
+			self._started += 1
+		try:
+			return _Container(), True
+		except BaseException:
+			with self._lock:
+				self._started -= 1
+			raise
+
+	def release(self, container: _Container):
+		"""Make a container available to the next invocation."""
+		with self._lock:
+			self._idle.append(container)
+
+
+def _event(user: int, rng: random.Random) -> dict:
+	return {
+		'requestContext': {'authorizer': {'claims': {'sub': f'resident-{user}'}}},
+		'body': json.dumps({'query': rng.choice(QUESTIONS)}),
+	}
+
+
+def _invoke(pool: _ContainerPool, event: dict) -> dict:
+	container, cold = pool.acquire()
+	if container is None:
+		return {'status': 'rejected'}
+
+	start = time.perf_counter()
+	try:
+		response = container.invoke(event)
+		ok = response['statusCode'] == 200
+	except Exception:
+		ok = False
+	latency = time.perf_counter() - start + (container.init_seconds if cold else 0)
+	pool.release(container)
+
+	if not ok:
+		status = 'error'
+	elif container.failures:
+		status = 'degraded'
+	else:
+		status = 'ok'
+	return {
+		'status': status,
+		'cold': cold,
+		'latency': latency,
+		'attempts': container.attempts,
+	}
+
+
+def _resident(user: int, pool, started: float, duration: float, think: float, results):
+	rng = random.Random(user)
+	while time.perf_counter() - started < duration:
+		result = _invoke(pool, _event(user, rng))
+		result['end'] = time.perf_counter() - started
+		results.append(result)
+		if result['status'] == 'rejected':
+			time.sleep(REJECTED_BACKOFF)
+		elif think:
+			time.sleep(rng.expovariate(1 / think))
+
+
+def _percentile(values: list[float], q: int) -> float:
+	return values[min(len(values) - 1, len(values) * q // 100)]
+
+
+def _report_row(label, results, throttle_counts, baseline, interval):
+	ran = [r for r in results if r['status'] != 'rejected']
+	statuses = [r['status'] for r in results]
+	latencies = sorted(r['latency'] for r in ran)
+	requests, throttled = throttle_counts
+	amplification = (
+		sum(r['attempts'] for r in ran) / (len(ran) * baseline) if ran else 0.0
+	)
+	percentiles = (
+		' '.join(f'{_percentile(latencies, q):>6.2f}s' for q in (50, 95, 99))
+		if latencies
+		else f'{"-":>7} {"-":>7} {"-":>7}'
+	)
+	print(
+		f'{label:>9} {len(results):>5} {statuses.count("ok") / interval:>9.2f} '
+		f'{statuses.count("degraded"):>8} {statuses.count("error"):>6} '
+		f'{statuses.count("rejected"):>8} {sum(r.get("cold", False) for r in ran):>5} '
+		f'{throttled / requests if requests else 0:>9.1%} {amplification:>6.2f}x '
+		f'{percentiles}'
+	)
+
+
+def _option(args: list[str], name: str, default, cast=int):
+	if name not in args:
+		return default
+	return cast(args[args.index(name) + 1])
+
+
+def main():
+	"""Run the residents against the stand-in and print the report."""
+	args = sys.argv[1:]
+	users = _option(args, '--users', 20)
+	duration = _option(args, '--duration', 30.0, float)
+	rpm = _option(args, '--rpm', 6000)
+	concurrency = _option(args, '--concurrency', users)
+	provisioned = _option(args, '--provisioned', 0)
+	think = _option(args, '--think', 1.0, float)
+	interval = _option(args, '--interval', 5.0, float)
+	os.environ['AWS_MAX_ATTEMPTS'] = _option(args, '--max-attempts', '3', str)
+	os.environ['AWS_RETRY_MODE'] = _option(args, '--retry-mode', 'standard', str)
+
+	receiver, sender = multiprocessing.Pipe(duplex=False)
+	server = multiprocessing.Process(target=_serve, args=(sender,), daemon=True)
+	server.start()
+	endpoint = f'http://127.0.0.1:{receiver.recv()}'
+	os.environ['AWS_ENDPOINT_URL'] = endpoint
+
+	print(
+		f'{users} residents for {duration:.0f}s, {rpm} RPM per model, '
+		f'concurrency {concurrency} ({provisioned} provisioned), '
+		f'retries: {os.environ["AWS_RETRY_MODE"]} x{os.environ["AWS_MAX_ATTEMPTS"]}'
+	)
+	results = []
+	with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+		# One invocation without a quota gives the requests an invocation needs.
+		_control(endpoint, '/_reset', {'rpm': 0})
+		calibration = _Container()
+		calibration.invoke(_event(0, random.Random(0)))
+		baseline = calibration.attempts
+
+		pool = _ContainerPool(concurrency, provisioned)
+		_control(endpoint, '/_reset', {'rpm': rpm})
+		started = time.perf_counter()
+		residents = [
+			threading.Thread(
+				target=_resident,
+				args=(user, pool, started, duration, think, results),
+				daemon=True,
+			)
+			for user in range(users)
+		]
+		for resident in residents:
+			resident.start()
+		for resident in residents:
+			resident.join()
+		elapsed = time.perf_counter() - started
+		seconds = _control(endpoint, '/_stats')
+	server.terminate()
+
+	print(f'baseline: {baseline} HTTP requests per invocation')
+	print(
+		f'{"time":>9} {"done":>5} {"goodput/s":>9} {"degraded":>8} {"errors":>6} '
+		f'{"rejected":>8} {"cold":>5} {"throttled":>9} {"ampl.":>7} '
+		f'{"p50":>7} {"p95":>7} {"p99":>7}'
+	)
+	for index in range(math.ceil(elapsed / interval)):
+		low, high = index * interval, (index + 1) * interval
+		window = [r for r in results if low <= r['end'] < high]
+		counts = [
+			sum(c[i] for s, c in seconds.items() if low <= int(s) < high) for i in (0, 1)
+		]
+		_report_row(f'{low:.0f}-{high:.0f}s', window, counts, baseline, high - low)
+	totals = [sum(c[i] for c in seconds.values()) for i in (0, 1)]
+	_report_row('all', results, totals, baseline, elapsed)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,62 @@
+"""Compare per-chunk metadata models with VectorMetadataBatch.
+
+Usage:
+	python benchmarks/metadata_batch.py [num_chunks]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(
+	0,
+	os.path.join(os.path.dirname(__file__), '..', 'main', 'layers', 'rag_core_lib'),
+)
+
+from models import FileVectorMetadata, VectorMetadataBatch  # noqa: E402
+
+SHARED = {
+	'user_id': 'user-1',
+	'visibility': 'private',
+	'file_id': 'file-1',
+	'file_name': 'bylaws.pdf',
+	'file_type': 'pdf',
+	'created_at': '2026-01-01T00:00:00Z',
+}
+
+
+def _chunks(n: int) -> list[dict]:
+	return [
+		{
+			'chunk_text': f'chunk body {i} ' * 30,
+			'chunk_hash': f'{i:032x}',
+			'chunk_index': i,
+		}
+		for i in range(n)
+	]
+
+
+def per_chunk_models(chunks: list[dict]) -> list[dict]:
+	"""Build metadata the way the ingest handler used to."""
+	return [FileVectorMetadata(**SHARED, **c).to_s3_metadata() for c in chunks]
+
+
+def batched(chunks: list[dict]) -> list[dict]:
+	"""Build metadata with a single VectorMetadataBatch."""
+	batch = VectorMetadataBatch(FileVectorMetadata, **SHARED)
+	return [batch.to_s3_metadata(**c) for c in chunks]
+
+
+def main():
+	"""Run both builders and print throughput."""
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+	chunks = _chunks(n)
+	assert per_chunk_models(chunks) == batched(chunks)
+
+	for name, fn in (('per-chunk models', per_chunk_models), ('batched', batched)):
+		seconds = min(timeit.repeat(lambda: fn(chunks), number=1, repeat=5))
+		print(f'{name:>16}: {seconds * 1000:8.1f} ms  ({n / seconds:,.0f} chunks/s)')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,63 @@
+"""Measure rerank calls saved by MMR on near-duplicate candidates.
+
+Simulates query results made of a few topics, each repeated as several
+near-copies, and compares the current path (rerank every candidate)
+with MMR selection ahead of reranking.
+
+Usage:
+	python benchmarks/mmr.py [topics] [copies_per_topic] [mmr_top_k]
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+os.environ.setdefault('VECTOR_BUCKET_NAME', 'benchmark-vector-bucket')
+os.environ.setdefault('VECTOR_INDEX_NAME', 'benchmark-vector-index')
+sys.path.insert(
+	0,
+	os.path.join(os.path.dirname(__file__), '..', 'main', 'layers', 'rag_core_lib'),
+)
+
+from rag_engine.diversifier import mmr_select  # noqa: E402
+
+DIMENSIONS = 1024
+
+
+def _candidates(topics: int, copies: int, rng: np.random.Generator):
+	query = rng.normal(size=DIMENSIONS)
+	chunks = []
+	for topic in range(topics):
+		centre = query * rng.uniform(0.2, 1.0) + rng.normal(size=DIMENSIONS)
+		for _ in range(copies):
+			embedding = centre + rng.normal(scale=0.05, size=DIMENSIONS)
+			chunks.append(
+				{'data': {'float32': embedding.tolist()}, 'metadata': {'topic': topic}}
+			)
+	return query.tolist(), chunks
+
+
+def main():
+	"""Run the comparison and print rerank calls and topic coverage."""
+	topics = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+	copies = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+	top_k = int(sys.argv[3]) if len(sys.argv) > 3 else topics
+	query, chunks = _candidates(topics, copies, np.random.default_rng(7))
+
+	selected = mmr_select(query, chunks, top_k=top_k, lambda_mult=0.5)
+	seconds = min(
+		timeit.repeat(lambda: mmr_select(query, chunks, top_k), number=10, repeat=5)
+	)
+
+	covered = len({c['metadata']['topic'] for c in selected})
+	print(f'candidates:          {len(chunks)}')
+	print(f'rerank calls before: {len(chunks)}  (topics covered: {topics})')
+	print(f'rerank calls after:  {len(selected)}  (topics covered: {covered})')
+	print(f'rerank calls saved:  {len(chunks) - len(selected)}')
+	print(f'mmr selection time:  {seconds / 10 * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,73 @@
+"""Compare clean_data with the offset-tracking normalizer.
+
+Reports throughput and peak traced memory for each, on the given text
+files or on generated bylaws-like text.
+
+Usage:
+	python benchmarks/normalizer.py [file ...]
+"""
+
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+os.environ.setdefault('VECTOR_BUCKET_NAME', 'benchmark-vector-bucket')
+os.environ.setdefault('VECTOR_INDEX_NAME', 'benchmark-vector-index')
+sys.path.insert(
+	0,
+	os.path.join(os.path.dirname(__file__), '..', 'main', 'layers', 'rag_core_lib'),
+)
+
+from rag_engine import clean_data, normalize  # noqa: E402
+
+WORDS = (
+	'the board shall approve any fence over six feet. owners must submit form '
+	'hoa-17 before exterior changes! pool hours are 9am-9pm? see section 4.2 (a) '
+	"for guest fees @ $5 per visit; the owner's lot . . . . 12 art-\nicle iv."
+).split(' ')
+
+
+def _generated() -> str:
+	rng = random.Random(0)
+	lines = (' '.join(rng.choice(WORDS) for _ in range(12)) for _ in range(60000))
+	return '\n'.join(lines)
+
+
+def _peak_memory(fn, text: str) -> int:
+	tracemalloc.start()
+	fn(text)
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return peak
+
+
+def main():
+	"""Check equivalence, then print throughput and peak memory."""
+	texts = []
+	for path in sys.argv[1:]:
+		with open(path) as f:
+			texts.append(f.read())
+	text = '\n\n'.join(texts) if texts else _generated()
+
+	cleaned, offsets = normalize(text)
+	assert cleaned == clean_data(text), 'normalize differs from clean_data'
+	runs = len(offsets.cleaned_starts)
+	map_bytes = runs * 2 * offsets.cleaned_starts.itemsize
+	print(
+		f'{len(text) / 1e6:.1f}M characters, {runs:,} offset runs '
+		f'({map_bytes / 1e6:.1f} MB)'
+	)
+
+	for name, fn in (('clean_data', clean_data), ('normalize', normalize)):
+		seconds = min(timeit.repeat(lambda: fn(text), number=1, repeat=5))
+		peak = _peak_memory(fn, text)
+		print(
+			f'{name:>10}: {len(text) / seconds / 1e6:6.1f}M chars/s, '
+			f'peak {peak / 1e6:6.1f} MB'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,94 @@
+"""Measure how ChunkingPool scales from one worker process to many.
+
+Documents are read from the given text files, or generated when none are
+given. Each run is checked against serial get_chunks before it is timed.
+
+Usage:
+	python benchmarks/parallel_chunking.py [--workers N] [--large] [file ...]
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('VECTOR_BUCKET_NAME', 'benchmark-vector-bucket')
+os.environ.setdefault('VECTOR_INDEX_NAME', 'benchmark-vector-index')
+sys.path.insert(
+	0,
+	os.path.join(os.path.dirname(__file__), '..', 'main', 'layers', 'rag_core_lib'),
+)
+
+from rag_engine import ChunkingPool, get_chunks  # noqa: E402
+
+WORDS = (
+	'the board shall approve any fence over six feet. owners must submit form '
+	'hoa-17 before exterior changes! pool hours are 9am-9pm? see section 4.2 (a) '
+	'for guest fees @ $5 per visit, and article iv . . . . 12 for parking.'
+).split()
+
+
+def _document(rng: random.Random, paragraphs: int) -> str:
+	return '\n\n'.join(
+		' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 120)))
+		for _ in range(paragraphs)
+	)
+
+
+def _corpus(large: bool) -> list[str]:
+	rng = random.Random(0)
+	if large:
+		# A few very large documents, which are split at paragraph breaks.
+		return [_document(rng, 20000) for _ in range(4)]
+	return [_document(rng, rng.randint(5, 200)) for _ in range(2000)]
+
+
+def _as_tuples(chunks) -> list[tuple]:
+	return [(c.text, c.start_index, c.end_index) for c in chunks]
+
+
+def main():
+	"""Time serial chunking, then the pool at increasing worker counts."""
+	args = sys.argv[1:]
+	max_workers = os.cpu_count()
+	if '--workers' in args:
+		max_workers = int(args.pop(args.index('--workers') + 1))
+		args.remove('--workers')
+	large = '--large' in args
+	paths = [a for a in args if not a.startswith('--')]
+
+	if paths:
+		texts = []
+		for path in paths:
+			with open(path) as f:
+				texts.append(f.read())
+	else:
+		texts = _corpus(large)
+	total_chars = sum(len(t) for t in texts)
+	print(f'{len(texts)} documents, {total_chars / 1e6:.1f}M characters')
+
+	start = time.perf_counter()
+	expected = [_as_tuples(get_chunks(t)) for t in texts]
+	serial = time.perf_counter() - start
+	print(f'{"serial":>10}: {serial:8.2f} s')
+
+	workers = 1
+	while True:
+		with ChunkingPool(max_workers=workers, split_chars=200000) as pool:
+			# Start the processes before timing.
+			list(pool.chunk_documents(['warm up'] * workers))
+			start = time.perf_counter()
+			results = [_as_tuples(r) for r in pool.chunk_documents(iter(texts))]
+			seconds = time.perf_counter() - start
+		assert results == expected, 'parallel chunks differ from get_chunks'
+		print(
+			f'{workers:>3} worker{"s" if workers > 1 else " "}: {seconds:8.2f} s'
+			f'  ({serial / seconds:.2f}x, {total_chars / seconds / 1e6:.1f}M chars/s)'
+		)
+		if workers >= max_workers:
+			break
+		workers = min(workers * 2, max_workers)
+
+
+if __name__ == '__main__':
+	main()
@@ -3,24 +3,51 @@ import json
 import time
 import uuid
 
-from clients.factory import get_s3_vector_client
-from models import BaseVectorMetadata
-from rag_engine import Config, get_chunks, get_embedding
+from clients.factory import get_bedrock_client, get_s3_vector_client, prewarm_client
+from models import VectorMetadataBatch
+from rag_engine import (
+	Config,
+	get_chunk_ref,
+	get_chunk_store,
+	get_chunks_with_offsets,
+	get_embedding,
+	get_lexical_index_store,
+	get_scope,
+	profile_handler,
+)
 
 s3vector_client = get_s3_vector_client()
+chunk_store = get_chunk_store()
+lexical_store = get_lexical_index_store()
 
+# Open connections during init so the first chunk skips TLS handshakes.
+if Config.PREWARM_CONNECTIONS:
+	prewarm_client(get_bedrock_client(), 1)
+	prewarm_client(s3vector_client, 1)
 
+
+@profile_handler
 def lambda_handler(event, context):
 	claims = event['requestContext']['authorizer']['claims']
 	user_id = claims['sub']
 
 	body = json.loads(event['body'])
-	chunks = get_chunks(body['text'])
+	# Each chunk keeps its span in the submitted text so answers can cite it.
+	chunks = get_chunks_with_offsets(body['text'])
 	new_vectors = []
+	chunk_bodies = {}
+	lexical_documents = {}
+
+	# Shared fields are validated once and timestamped once per document.
+	metadata_batch = VectorMetadataBatch(
+		user_id=user_id,
+		visibility='private',
+		source='file',
+	)
 
 	print(f'Processing {len(chunks)} chunks...')
 
-	for chunk in chunks:
+	for chunk, source_start, source_end in chunks:
 		# Skip short and noisy chunks.
 		if len(chunk.text) < 10:
 			continue
@@ -49,19 +76,26 @@ def lambda_handler(event, context):
 				print(f'Skipping duplicate chunk (Hash: {chunk_hash})')
 				continue
 
-		# Metadata for the new vector.
-		metadata = BaseVectorMetadata(
-			user_id=user_id,
-			visibility='private',
-			source='file',
-			chunk_text=chunk.text,
-			chunk_hash=chunk_hash,
-		)
+		# Keep the chunk body out-of-line when a chunk store is configured.
+		if chunk_store:
+			chunk_ref = get_chunk_ref(chunk_hash, 'private', user_id=user_id)
+			chunk_bodies[chunk_ref] = chunk.text
+			body_fields = {'chunk_ref': chunk_ref}
+		else:
+			body_fields = {'chunk_text': chunk.text}
+
+		vector_key = str(uuid.uuid4())
+		lexical_documents[vector_key] = chunk.text
 		new_vectors.append(
 			{
-				'key': str(uuid.uuid4()),
+				'key': vector_key,
 				'data': {'float32': chunk_embedding},
-				'metadata': metadata.to_s3_metadata(),
+				'metadata': metadata_batch.to_s3_metadata(
+					chunk_hash=chunk_hash,
+					source_start=source_start,
+					source_end=source_end,
+					**body_fields,
+				),
 			}
 		)
 		time.sleep(0.1)  # 100ms delay = max 600 requests per minute.
@@ -69,6 +103,10 @@ def lambda_handler(event, context):
 	print('Chunks processing completed')
 	print(f'Inserting {len(new_vectors)} vectors to the storage')
 
+	# Bodies must be stored before the vectors referencing them become visible.
+	if chunk_bodies:
+		chunk_store.put_many(chunk_bodies)
+
 	# Batch insert only new vectors.
 	if new_vectors:
 		s3vector_client.put_vectors(
@@ -77,6 +115,12 @@ def lambda_handler(event, context):
 			vectors=new_vectors,
 		)
 		print(f'Successfully inserted {len(new_vectors)} new vectors')
+
+		# Keep the scope's BM25 index in step with the vector index.
+		if lexical_store:
+			lexical_store.add_documents(
+				get_scope('private', user_id=user_id), lexical_documents
+			)
 	else:
 		print('No new vectors to insert.')
 
@@ -1,66 +1,134 @@
+import concurrent.futures
 import json
 
-from clients.factory import get_s3_vector_client
-from rag_engine import Config, generate_answer, get_embedding, rerank_chunks
+from clients.factory import get_bedrock_client, get_s3_vector_client, prewarm_client
+from rag_engine import (
+	Config,
+	adaptive_cutoff,
+	build_history,
+	generate_answer,
+	get_chunk_store,
+	get_embedding,
+	get_lexical_index_store,
+	get_scope,
+	hydrate_chunks,
+	load_conversation,
+	mmr_select,
+	profile_handler,
+	rerank_chunks,
+	retrieve_candidates,
+	save_exchange,
+	single_flight_stats,
+)
+from rag_engine.reranker import bedrock_client as reranker_client
 
-s3vector_client = get_s3_vector_client()
+NO_ANSWER = "I don't have enough information to answer that."
 
+chunk_store = get_chunk_store()
+lexical_store = get_lexical_index_store()
 
+# Open connections during init so the first query skips TLS handshakes.
+if Config.PREWARM_CONNECTIONS:
+	prewarm_client(reranker_client, Config.PREWARM_CONNECTIONS)
+	prewarm_client(get_bedrock_client(), 1)
+	prewarm_client(get_s3_vector_client(), 1)
+
+
+@profile_handler
 def lambda_handler(event, context):
 	claims = event['requestContext']['authorizer']['claims']
 	user_id = claims['sub']
 
 	body = json.loads(event['body'])
 	query = body['query']
+	chat_id = body.get('chat_id')
+
+	query_embedding = get_embedding(query)
 
-	response = s3vector_client.query_vectors(
-		vectorBucketName=Config.VECTOR_BUCKET,
-		indexName=Config.VECTOR_INDEX,
-		topK=20,
-		queryVector={
-			'float32': get_embedding(query),
-		},
-		filter={
-			'$and': [
-				{'user_id': user_id},
-				{'visibility': 'private'},
-			],
-		},
-		returnMetadata=True,
-		returnDistance=True,
-	)
-
-	vectors = response.get('vectors', [])
-
-	if not vectors:
-		return {
-			'statusCode': 200,
-			'body': json.dumps(
-				{'answer': "I don't have enough information to answer that."}
+	with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+		# Follow-up questions carry a bounded slice of their conversation, loaded
+		# while the documents are retrieved.
+		conversation_future = (
+			executor.submit(load_conversation, chat_id, user_id, query_embedding)
+			if chat_id
+			else None
+		)
+
+		# Vector search, fused with BM25 search when a lexical index is configured.
+		vectors = retrieve_candidates(
+			query=query,
+			query_embedding=query_embedding,
+			vector_filter={
+				'$and': [
+					{'user_id': user_id},
+					{'visibility': 'private'},
+					{'source': {'$ne': 'chat'}},
+				],
+			},
+			scope=get_scope('private', user_id=user_id),
+			lexical_store=lexical_store,
+			return_data=Config.MMR_ENABLED,
+			top_k=(
+				Config.ADAPTIVE_CANDIDATES
+				if Config.ADAPTIVE_TOP_K_ENABLED
+				else Config.VECTOR_TOP_K
 			),
-		}
+		)
+		conversation = conversation_future.result() if conversation_future else None
+
+	# Rerank only as many candidates as their distances justify.
+	if Config.ADAPTIVE_TOP_K_ENABLED:
+		vectors, cutoff_stats = adaptive_cutoff(
+			vectors,
+			min_k=Config.ADAPTIVE_MIN_K,
+			max_k=Config.ADAPTIVE_MAX_K,
+			max_distance=Config.ADAPTIVE_MAX_DISTANCE,
+			min_gap=Config.ADAPTIVE_MIN_GAP,
+		)
+		print(json.dumps({'adaptive_top_k': cutoff_stats}))
+
+	# Drop near-duplicate candidates so they don't cost rerank calls.
+	if Config.MMR_ENABLED:
+		candidates = len(vectors)
+		vectors = mmr_select(
+			query_embedding,
+			vectors,
+			top_k=Config.MMR_TOP_K,
+			lambda_mult=Config.MMR_LAMBDA,
+		)
+		print(f'MMR kept {len(vectors)} of {candidates} candidates for reranking')
+
+	# Fetch out-of-line chunk bodies in one bulk call, if any are referenced.
+	vectors = hydrate_chunks(vectors, chunk_store)
 
 	# Rerank the initially vector chunks to show best matching result.
-	top_chunks = rerank_chunks(
-		query=query,
-		chunks=vectors,
-	)
-
-	if not top_chunks:
-		return {
-			'statusCode': 200,
-			'body': json.dumps(
-				{'answer': "I don't have enough information to answer that."}
-			),
-		}
+	top_chunks = rerank_chunks(query=query, chunks=vectors) if vectors else []
+
+	if top_chunks:
+		final_answer = generate_answer(
+			query,
+			top_chunks,
+			history=build_history(conversation) if conversation else '',
+		)
+	else:
+		final_answer = NO_ANSWER
+
+	# Every turn is stored, including unanswered ones. Lambda freezes the
+	# container once the handler returns, so the write can't outlive the
+	# invocation: its answer embedding and fast-model summary, run in parallel,
+	# add about one model call of latency to each conversational reply.
+	if conversation:
+		save_exchange(conversation, user_id, query, query_embedding, final_answer)
 
-	final_answer = generate_answer(query, top_chunks)
+	# Container-lifetime counts of Bedrock calls shared between callers.
+	print(json.dumps({'single_flight': single_flight_stats()}))
 
 	return {
 		'statusCode': 200,
 		'body': json.dumps(
 			{
 				'answer': final_answer,
+				**({'chat_id': chat_id} if chat_id else {}),
 			}
 		),
 	}
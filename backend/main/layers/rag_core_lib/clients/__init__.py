@@ -1,3 +1,15 @@
-from .factory import get_bedrock_client, get_s3_vector_client
+from .factory import (
+	get_bedrock_client,
+	get_client,
+	get_s3_client,
+	get_s3_vector_client,
+	prewarm_client,
+)
 
-__all__ = ['get_bedrock_client', 'get_s3_vector_client']
+__all__ = [
+	'get_bedrock_client',
+	'get_client',
+	'get_s3_client',
+	'get_s3_vector_client',
+	'prewarm_client',
+]
@@ -1,48 +1,161 @@
 """Client Factory Module for AWS AI/ML Services."""
 
+import concurrent.futures
+import os
+import threading
+
 import boto3
 from botocore.config import Config
 
 # Optimized config for AI/RAG workloads
-# Increased retries and timeouts for LLM latency
+# Increased retries and timeouts for LLM latency. The retry policy honours the
+# standard AWS_MAX_ATTEMPTS and AWS_RETRY_MODE variables, which an explicit
+# retries setting would otherwise override.
 DEFAULT_CONFIG = Config(
-	retries={'max_attempts': 3, 'mode': 'standard'},
+	retries={
+		'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', 3)),
+		'mode': os.environ.get('AWS_RETRY_MODE', 'standard'),
+	},
 	connect_timeout=5,
 	read_timeout=60,  # Bedrock can take time for large generations
+	tcp_keepalive=True,  # Keep pooled connections alive between warm invocations
 )
 
-# Global cache for clients to enable reuse across "warm" invocations
+# botocore's default connection pool size.
+DEFAULT_POOL_CONNECTIONS = 10
+
+# Global cache for clients to enable reuse across "warm" invocations, keyed by
+# (service, region, pool size, endpoint).
 _CLIENT_CACHE = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def get_client(
+	service_name: str,
+	region: str = 'us-east-1',
+	max_pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+	endpoint_url: str | None = None,
+):
+	"""Return a cached client sized for the caller's concurrency.
+
+	Consumers that run calls in parallel should pass their worker count
+	as max_pool_connections, so threads don't queue for connections.
+
+	Args:
+		service_name (str): The AWS service name, e.g. bedrock-runtime.
+		region (str): The AWS region. Defaults to us-east-1.
+		max_pool_connections (int): Size of the client's connection pool.
+		endpoint_url (str): Optional endpoint override, e.g. a local fake.
+
+	Returns:
+		boto3.client: An initialized client.
+
+	"""
+	cache_key = (service_name, region, max_pool_connections, endpoint_url)
+	client = _CLIENT_CACHE.get(cache_key)
+	if client is None:
+		# boto3's default session is not thread-safe while creating clients.
+		with _CLIENT_CACHE_LOCK:
+			client = _CLIENT_CACHE.get(cache_key)
+			if client is None:
+				client = boto3.client(
+					service_name=service_name,
+					region_name=region,
+					endpoint_url=endpoint_url,
+					config=DEFAULT_CONFIG.merge(
+						Config(max_pool_connections=max_pool_connections)
+					),
+				)
+				_CLIENT_CACHE[cache_key] = client
+	return client
 
 
-def get_bedrock_client(region: str = 'us-east-1'):
+def get_bedrock_client(
+	region: str = 'us-east-1',
+	max_pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+):
 	"""Return a cached bedrock-runtime client.
 
 	Args:
-        region (str): The AWS region for Bedrock. Defaults to us-east-1.
+		region (str): The AWS region for Bedrock. Defaults to us-east-1.
+		max_pool_connections (int): Size of the client's connection pool.
 
 	Returns:
-        boto3.client: An initialized bedrock-runtime client.
+		boto3.client: An initialized bedrock-runtime client.
 
 	"""
-	if 'bedrock' not in _CLIENT_CACHE:
-		_CLIENT_CACHE['bedrock'] = boto3.client(
-			service_name='bedrock-runtime', region_name=region, config=DEFAULT_CONFIG
-		)
-	return _CLIENT_CACHE['bedrock']
+	return get_client('bedrock-runtime', region, max_pool_connections)
 
 
-def get_s3_vector_client(region: str = 'us-east-1'):
+def get_s3_vector_client(
+	region: str = 'us-east-1',
+	max_pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+):
 	"""Return a cached S3 client for Vector searches.
 
 	Note: S3 Vectors uses the standard S3 client with specific parameters.
 
+	Args:
+		region (str): The AWS region for S3 Vectors. Defaults to us-east-1.
+		max_pool_connections (int): Size of the client's connection pool.
+
+	Returns:
+		boto3.client: An initialized S3 client.
+
+	"""
+	return get_client('s3vectors', region, max_pool_connections)
+
+
+def get_s3_client(
+	region: str = 'us-east-1',
+	max_pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+):
+	"""Return a cached S3 client for object storage.
+
+	Args:
+		region (str): The AWS region for S3. Defaults to us-east-1.
+		max_pool_connections (int): Size of the client's connection pool.
+
+	Returns:
+		boto3.client: An initialized S3 client.
+
+	"""
+	return get_client('s3', region, max_pool_connections)
+
+
+def prewarm_client(client, connections: int) -> int:
+	"""Open pooled connections to the client's endpoint ahead of first use.
+
+	Intended for Lambda init, so the first requests of a fresh container
+	don't pay TCP and TLS handshakes on the critical path. This relies on
+	botocore's urllib3 session internals and is best-effort: failures are
+	logged and ignored.
+
+	Args:
+		client: A boto3 client returned by this module.
+		connections (int): Number of connections to open, capped by the
+			client's pool size.
+
 	Returns:
-        boto3.client: An initialized S3 client.
+		int: The number of connections opened.
 
 	"""
-	if 's3vectors' not in _CLIENT_CACHE:
-		_CLIENT_CACHE['s3vectors'] = boto3.client(
-			service_name='s3vectors', region_name=region, config=DEFAULT_CONFIG
-		)
-	return _CLIENT_CACHE['s3vectors']
+	try:
+		http_session = client._endpoint.http_session
+		pool = http_session._manager.connection_from_url(client.meta.endpoint_url)
+		connections = min(connections, client.meta.config.max_pool_connections)
+
+		def _open(_):
+			# Taking from the pool swaps out one of its empty slots.
+			conn = pool._get_conn()
+			conn.connect()
+			return conn
+
+		with concurrent.futures.ThreadPoolExecutor(max_workers=connections) as executor:
+			opened = list(executor.map(_open, range(connections)))
+		for conn in opened:
+			pool._put_conn(conn)
+		return len(opened)
+	except Exception as e:
+		print(f'Error pre-warming {type(client).__name__}: {e}')
+		return 0
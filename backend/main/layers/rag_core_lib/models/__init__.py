@@ -1,3 +1,4 @@
+from .metadata_batch import VectorMetadataBatch
 from .vector_metadata import (
 	BaseVectorMetadata,
 	ChatVectorMetadata,
@@ -12,4 +13,5 @@ __all__ = [
 	'FileVectorMetadata',
 	'PublicVectorMetadata',
 	'TextVectorMetadata',
+	'VectorMetadataBatch',
 ]
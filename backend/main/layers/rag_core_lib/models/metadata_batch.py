@@ -0,0 +1,125 @@
+"""Build S3 vector metadata for many chunks of the same document.
+
+Constructing a Pydantic model per chunk re-validates the document-level
+fields and takes a new timestamp for every chunk. This module validates
+the shared fields once, then emits per-chunk S3 metadata dictionaries
+directly while producing the same output as the metadata models.
+"""
+
+from typing import Any
+
+import pendulum
+from pydantic import BaseModel, create_model
+
+from .vector_metadata import BaseVectorMetadata
+
+# Fields that decide the visibility scope. They are validated once, with the
+# shared fields, so chunks may not set them.
+_SCOPE_FIELDS = frozenset({'user_id', 'tenant_id', 'visibility'})
+
+_PRIMITIVES = (str, int, float, bool)
+
+
+def _to_s3_values(values: dict[str, Any]) -> dict[str, Any]:
+	return {
+		k: v if isinstance(v, _PRIMITIVES) or v is None else str(v)
+		for k, v in values.items()
+	}
+
+
+class VectorMetadataBatch:
+	"""Emit S3 metadata for chunks that share document-level fields.
+
+	The first chunk with a given set of fields is validated through the
+	model, which runs its model validators. Later chunks with the same set
+	only have their own values validated and coerced, by a model of just
+	those fields. The model validators depend on which fields are set
+	rather than their values, except for the scope fields user_id,
+	tenant_id and visibility, which must therefore be shared fields.
+	"""
+
+	def __init__(self, model: type[BaseVectorMetadata] = BaseVectorMetadata, **shared):
+		"""Initialize the batch with the fields shared by every chunk.
+
+		Args:
+			model: The metadata model the output must match.
+			**shared: Document-level fields such as user_id, visibility,
+				source or file details.
+
+		"""
+		self._model = model
+		self._shared = shared
+		if 'created_at' not in shared:
+			self._shared['created_at'] = pendulum.now().to_iso8601_string()
+
+		self._fields = model.model_fields
+		# Shared values and the defaults of the other optional fields, as S3
+		# values. Built once the shared fields have been validated by the model.
+		self._base = None
+		# For each validated shape, a model of its fields and the output keys.
+		self._shapes = {}
+
+	def _fields_model(self, names) -> type[BaseModel]:
+		# The model's fields without its model validators.
+		return create_model(
+			'ChunkFields',
+			**{
+				name: (self._fields[name].annotation, self._fields[name])
+				for name in names
+			},
+		)
+
+	@staticmethod
+	def _dump(fields_model: type[BaseModel], fields: dict[str, Any]) -> dict[str, Any]:
+		validated = fields_model.model_validate(fields)
+		values = validated.__dict__
+		# Primitives dump to themselves, so only run the serializer for others.
+		for value in values.values():
+			if not (value is None or type(value) in _PRIMITIVES):
+				return _to_s3_values(validated.model_dump(mode='json'))
+		return values
+
+	def _build_base(self) -> dict[str, Any]:
+		values = {k: v for k, v in self._shared.items() if k in self._fields}
+		for name, field in self._fields.items():
+			if name not in values and not field.is_required():
+				values[name] = field.get_default(call_default_factory=True)
+		return self._dump(self._fields_model(values), values)
+
+	def to_s3_metadata(self, **chunk_fields) -> dict[str, str | int | float | bool]:
+		"""Build the S3 metadata for a single chunk.
+
+		Args:
+			**chunk_fields: Per-chunk fields such as chunk_text or chunk_ref,
+				chunk_hash and chunk_index.
+
+		Returns:
+			A dictionary equal to the model's to_s3_metadata output.
+
+		Raises:
+			ValueError: If a chunk field sets the visibility scope or overrides
+				a shared field, or the combined fields fail model validation.
+
+		"""
+		scope_fields = _SCOPE_FIELDS & chunk_fields.keys()
+		if scope_fields:
+			raise ValueError(f'scope fields must be shared: {sorted(scope_fields)}')
+
+		overlap = self._shared.keys() & chunk_fields.keys()
+		if overlap:
+			raise ValueError(f'chunk fields override shared fields: {sorted(overlap)}')
+
+		shape = frozenset(chunk_fields)
+		if shape not in self._shapes:
+			metadata = self._model(**self._shared, **chunk_fields).to_s3_metadata()
+			if self._base is None:
+				self._base = self._build_base()
+			# Like the model, ignore fields it doesn't define.
+			names = [k for k in self._fields if k in shape]
+			keys = [k for k in self._fields if k in shape or k in self._base]
+			self._shapes[shape] = (self._fields_model(names), keys)
+			return metadata
+
+		fields_model, keys = self._shapes[shape]
+		merged = {**self._base, **self._dump(fields_model, chunk_fields)}
+		return {k: merged[k] for k in keys if merged[k] is not None}
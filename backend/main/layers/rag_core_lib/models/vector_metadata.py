@@ -44,16 +44,30 @@ class BaseVectorMetadata(BaseModel):
 		description='Source of the file (e.g., file, text, chat or note)',
 	)
 
-	chunk_text: str = Field(
-		...,
+	chunk_text: Optional[str] = Field(
+		None,
 		description='The actual chunked text that is embedded',
 	)
 
+	chunk_ref: Optional[str] = Field(
+		None,
+		description='Reference to the chunk text kept in an out-of-line chunk store',
+	)
+
 	chunk_hash: str = Field(
 		...,
 		description='The hash of the chunked text that is embedded',
 	)
 
+	source_start: Optional[int] = Field(
+		None, description='Start offset of the chunk in the ingested source text'
+	)
+
+	source_end: Optional[int] = Field(
+		None,
+		description='End offset (exclusive) of the chunk in the ingested source text',
+	)
+
 	created_at: str = Field(
 		default_factory=lambda: pendulum.now().to_iso8601_string(),
 		description='Vector creation date and time',
@@ -81,6 +95,19 @@ class BaseVectorMetadata(BaseModel):
 
 		return self
 
+	@model_validator(mode='after')
+	def validate_chunk_body(self):
+		"""Ensure the chunk body is stored either inline or by reference.
+
+		Raises:
+			ValueError: If neither or both of chunk_text and chunk_ref are set.
+
+		"""
+		if (self.chunk_text is None) == (self.chunk_ref is None):
+			raise ValueError('exactly one of chunk_text or chunk_ref is required')
+
+		return self
+
 	def to_s3_metadata(self) -> dict[str, str | int | float | bool]:
 		"""Convert metadata to an S3-compatible primitive format.
 
@@ -151,9 +178,9 @@ class ChatVectorMetadata(BaseVectorMetadata):
 
 	message_index: str = Field(..., description='Message index from the chat history')
 
-	role: Literal['user', 'assistant'] = Field(
+	role: Literal['user', 'assistant', 'summary'] = Field(
 		...,
-		description='The role of the message author',
+		description='The role of the message author, or summary for the rolling summary',
 	)
 
 
@@ -1,15 +1,65 @@
-from .chunker import clean_data, get_chunks
+from .chunk_store import (
+	ChunkStore,
+	LocalChunkStore,
+	S3ChunkStore,
+	get_chunk_ref,
+	get_chunk_store,
+	get_scope,
+	hydrate_chunks,
+)
+from .chunker import clean_data, get_chunks, get_chunks_with_offsets
 from .config import Config
+from .conversation import build_history, load_conversation, save_exchange
+from .cutoff import adaptive_cutoff
+from .diversifier import mmr_select
 from .embedder import get_embedding
 from .generator import generate_answer
+from .lexical_index import (
+	LexicalIndex,
+	LexicalIndexStore,
+	LocalLexicalIndexStore,
+	S3LexicalIndexStore,
+	get_lexical_index_store,
+)
+from .normalizer import OffsetMap, normalize
+from .parallel_chunker import ChunkingPool, split_paragraphs
+from .profiler import profile_handler
 from .reranker import rerank_chunks
+from .retriever import reciprocal_rank_fusion, retrieve_candidates
+from .single_flight import single_flight_stats
 
 __all__ = [
+	'ChunkStore',
+	'LocalChunkStore',
+	'S3ChunkStore',
+	'get_chunk_ref',
+	'get_chunk_store',
+	'get_scope',
+	'hydrate_chunks',
 	'get_chunks',
+	'get_chunks_with_offsets',
 	'clean_data',
+	'normalize',
+	'OffsetMap',
+	'ChunkingPool',
+	'split_paragraphs',
 	'get_embedding',
 	'generate_answer',
 	'rerank_chunks',
+	'mmr_select',
+	'LexicalIndex',
+	'LexicalIndexStore',
+	'LocalLexicalIndexStore',
+	'S3LexicalIndexStore',
+	'get_lexical_index_store',
+	'reciprocal_rank_fusion',
+	'retrieve_candidates',
+	'adaptive_cutoff',
+	'single_flight_stats',
+	'profile_handler',
+	'load_conversation',
+	'build_history',
+	'save_exchange',
 ]
 
 # Automatically validate config when the layer is loaded.
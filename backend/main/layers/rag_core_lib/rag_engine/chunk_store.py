@@ -0,0 +1,249 @@
+"""Module for storing chunk bodies outside of vector metadata.
+
+Chunk text is compressed and written to a blob store keyed by its
+chunk_hash, so vector metadata only needs to carry a short reference.
+Bodies are fetched in bulk, and only for the chunks that need them.
+"""
+
+import concurrent.futures
+import os
+import zlib
+from abc import ABC, abstractmethod
+
+from botocore.exceptions import ClientError
+from clients.factory import get_s3_client
+
+from .config import Config
+
+
+def get_scope(
+	visibility: str,
+	user_id: str | None = None,
+	tenant_id: str | None = None,
+) -> str:
+	"""Build the storage prefix for a visibility scope.
+
+	Private content is scoped per user, tenant content per tenant and
+	public content platform-wide.
+
+	Args:
+		visibility: The visibility scope of the content.
+		user_id: The owner of private content.
+		tenant_id: The owner of tenant content.
+
+	Returns:
+		A relative prefix identifying the scope.
+
+	"""
+	if visibility == 'private':
+		return f'private/{user_id}'
+	if visibility == 'tenant':
+		return f'tenant/{tenant_id}'
+	return 'public'
+
+
+def get_chunk_ref(
+	chunk_hash: str,
+	visibility: str,
+	user_id: str | None = None,
+	tenant_id: str | None = None,
+) -> str:
+	"""Build the blob store reference for a chunk body.
+
+	Bodies are deduplicated within their visibility scope, see get_scope.
+
+	Args:
+		chunk_hash: The hash of the chunk text.
+		visibility: The visibility scope of the chunk.
+		user_id: The owner of a private chunk.
+		tenant_id: The owner of a tenant chunk.
+
+	Returns:
+		A relative key identifying the chunk body.
+
+	"""
+	return f'{get_scope(visibility, user_id, tenant_id)}/{chunk_hash}'
+
+
+class ChunkStore(ABC):
+	"""Define the interface for compressed chunk body storage."""
+
+	@abstractmethod
+	def put_many(self, bodies: dict[str, str]) -> None:
+		"""Store chunk bodies under their references.
+
+		Args:
+			bodies: A mapping of chunk reference to chunk text.
+
+		"""
+
+	@abstractmethod
+	def get_many(self, refs: list[str]) -> dict[str, str]:
+		"""Fetch chunk bodies for the given references.
+
+		Args:
+			refs: The chunk references to fetch.
+
+		Returns:
+			A mapping of chunk reference to chunk text. Missing references
+			are left out of the result.
+
+		"""
+
+	@staticmethod
+	def _compress(text: str) -> bytes:
+		return zlib.compress(text.encode('utf-8'))
+
+	@staticmethod
+	def _decompress(blob: bytes) -> str:
+		return zlib.decompress(blob).decode('utf-8')
+
+
+class LocalChunkStore(ChunkStore):
+	"""Store compressed chunk bodies on the local filesystem."""
+
+	def __init__(self, root: str):
+		"""Initialize the store under the given root directory.
+
+		Args:
+			root: The directory where chunk bodies are written.
+
+		"""
+		self._root = root
+
+	def _path(self, ref: str) -> str:
+		return os.path.join(self._root, f'{ref}.z')
+
+	def put_many(self, bodies: dict[str, str]) -> None:
+		"""Write chunk bodies, skipping those already stored."""
+		for ref, text in bodies.items():
+			path = self._path(ref)
+			if os.path.exists(path):
+				continue
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			with open(path, 'wb') as f:
+				f.write(self._compress(text))
+
+	def get_many(self, refs: list[str]) -> dict[str, str]:
+		"""Read chunk bodies that exist on disk."""
+		bodies = {}
+		for ref in set(refs):
+			try:
+				with open(self._path(ref), 'rb') as f:
+					bodies[ref] = self._decompress(f.read())
+			except FileNotFoundError:
+				continue
+		return bodies
+
+
+class S3ChunkStore(ChunkStore):
+	"""Store compressed chunk bodies as S3 objects."""
+
+	def __init__(self, bucket: str, prefix: str = 'chunks', max_workers: int = 10):
+		"""Initialize the store for the given bucket and key prefix.
+
+		Args:
+			bucket: The S3 bucket holding chunk bodies.
+			prefix: The key prefix under which bodies are written.
+			max_workers: Number of parallel S3 requests for bulk calls.
+
+		"""
+		self._bucket = bucket
+		self._prefix = prefix
+		self._max_workers = max_workers
+		self._client = get_s3_client(max_pool_connections=max_workers)
+
+	def _key(self, ref: str) -> str:
+		return f'{self._prefix}/{ref}.z'
+
+	def _put(self, item: tuple[str, str]) -> None:
+		ref, text = item
+		self._client.put_object(
+			Bucket=self._bucket,
+			Key=self._key(ref),
+			Body=self._compress(text),
+			ContentType='application/octet-stream',
+		)
+
+	def _get(self, ref: str) -> str | None:
+		try:
+			response = self._client.get_object(Bucket=self._bucket, Key=self._key(ref))
+		except ClientError as e:
+			if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+				return None
+			raise e
+		return self._decompress(response['Body'].read())
+
+	def put_many(self, bodies: dict[str, str]) -> None:
+		"""Upload chunk bodies in parallel.
+
+		Keys are content-addressed, so rewriting an existing body is
+		idempotent.
+		"""
+		with concurrent.futures.ThreadPoolExecutor(
+			max_workers=self._max_workers
+		) as executor:
+			list(executor.map(self._put, bodies.items()))
+
+	def get_many(self, refs: list[str]) -> dict[str, str]:
+		"""Download chunk bodies in parallel."""
+		unique_refs = list(set(refs))
+		with concurrent.futures.ThreadPoolExecutor(
+			max_workers=self._max_workers
+		) as executor:
+			texts = executor.map(self._get, unique_refs)
+		return {ref: text for ref, text in zip(unique_refs, texts) if text is not None}
+
+
+def get_chunk_store() -> ChunkStore | None:
+	"""Return the configured chunk store.
+
+	Returns:
+		A ChunkStore instance, or None when chunk text is stored inline.
+
+	"""
+	if Config.CHUNK_STORE == 's3':
+		return S3ChunkStore(
+			Config.CHUNK_STORE_BUCKET,
+			prefix=Config.CHUNK_STORE_PREFIX,
+			max_workers=Config.CHUNK_STORE_WORKERS,
+		)
+	if Config.CHUNK_STORE == 'local':
+		return LocalChunkStore(Config.CHUNK_STORE_PATH)
+	return None
+
+
+def hydrate_chunks(chunks: list[dict], store: ChunkStore | None) -> list[dict]:
+	"""Fill in chunk_text for chunks that only carry a chunk_ref.
+
+	Fetch all missing bodies with a single bulk call. Chunks whose body
+	cannot be found are dropped.
+
+	Args:
+		chunks: A list of vector dictionaries returned by query_vectors.
+		store: The chunk store holding out-of-line bodies.
+
+	Returns:
+		The chunks that have chunk_text available.
+
+	"""
+	refs = [
+		c['metadata']['chunk_ref']
+		for c in chunks
+		if 'chunk_text' not in c['metadata'] and 'chunk_ref' in c['metadata']
+	]
+	if not refs or store is None:
+		return [c for c in chunks if 'chunk_text' in c['metadata']]
+
+	bodies = store.get_many(refs)
+	hydrated = []
+	for chunk in chunks:
+		metadata = chunk['metadata']
+		if 'chunk_text' not in metadata:
+			text = bodies.get(metadata.get('chunk_ref'))
+			if text is None:
+				print(f'Missing chunk body (Ref: {metadata.get("chunk_ref")})')
+				continue
+			metadata['chunk_text'] = text
+		hydrated.append(chunk)
+	return hydrated
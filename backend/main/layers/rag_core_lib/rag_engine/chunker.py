@@ -10,6 +10,7 @@ import re
 from chonkie import RecursiveChunker, RecursiveRules
 
 from .config import Config
+from .normalizer import normalize
 
 # Initialize chunker once at the module level for efficiency.
 _chunker = RecursiveChunker(
@@ -43,7 +44,7 @@ def clean_data(text: str) -> str:
 def get_chunks(text: str):
 	"""Clean and split text into semantic chunks.
 
-	First standardize the input text using clean_data, then apply
+	First standardize the input text with clean_data, then apply
 	the module-level RecursiveChunker to generate text segments.
 
 	Args:
@@ -53,5 +54,35 @@ def get_chunks(text: str):
 		A list or generator of text chunks.
 
 	"""
-	cleaned = clean_data(text)
+	return chunk_cleaned(clean_data(text))
+
+
+def get_chunks_with_offsets(text: str) -> list[tuple]:
+	"""Clean and split text into chunks that know where they came from.
+
+	Args:
+		text: The input text to be segmented.
+
+	Returns:
+		A list of (chunk, source_start, source_end) tuples, where the span
+		locates the chunk in the raw text, end exclusive.
+
+	"""
+	cleaned, offsets = normalize(text)
+	return [
+		(chunk, *offsets.source_span(chunk.start_index, chunk.end_index))
+		for chunk in chunk_cleaned(cleaned)
+	]
+
+
+def chunk_cleaned(cleaned: str):
+	"""Split text already standardized by clean_data into chunks.
+
+	Args:
+		cleaned: The output of clean_data.
+
+	Returns:
+		A list of text chunks.
+
+	"""
 	return _chunker.chunk(cleaned)
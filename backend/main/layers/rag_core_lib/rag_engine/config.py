@@ -22,13 +22,95 @@ class Config:
 		'arn:aws:bedrock:us-east-1:896368780050:inference-profile/us.anthropic.claude-3-5-haiku-20241022-v1:0',
 	)
 
+	# Generation routing: small, decisive contexts go to the fast model.
+	GENERATION_MAX_TOKENS = int(os.environ.get('GENERATION_MAX_TOKENS', 512))
+	FAST_GENERATION_MODEL = os.environ.get('FAST_GENERATION_MODEL', RERANKER_MODEL)
+	FAST_GENERATION_MAX_TOKENS = int(os.environ.get('FAST_GENERATION_MAX_TOKENS', 256))
+	ROUTING_ENABLED = os.environ.get('ROUTING_ENABLED', 'false').lower() == 'true'
+	ROUTING_MAX_CONTEXT_CHARS = int(os.environ.get('ROUTING_MAX_CONTEXT_CHARS', 1500))
+	ROUTING_MIN_TOP_SCORE = float(os.environ.get('ROUTING_MIN_TOP_SCORE', 8))
+	ROUTING_MIN_SCORE_GAP = float(os.environ.get('ROUTING_MIN_SCORE_GAP', 2))
+
 	CHUNK_SIZE = os.environ.get('CHUNK_SIZE', 512)
 
+	# Bulk chunking: worker processes (0 means one per core), and the size
+	# above which a document is cleaned in paragraph-aligned pieces.
+	CHUNKING_WORKERS = int(os.environ.get('CHUNKING_WORKERS', 0))
+	CHUNKING_SPLIT_CHARS = int(os.environ.get('CHUNKING_SPLIT_CHARS', 1000000))
+
+	# Parallel rerank calls; the reranker's connection pool is sized to match.
+	RERANKER_WORKERS = int(os.environ.get('RERANKER_WORKERS', 10))
+
+	# Hedging of idempotent Bedrock calls (scoring, embedding).
+	HEDGING_ENABLED = os.environ.get('HEDGING_ENABLED', 'false').lower() == 'true'
+	HEDGE_PERCENTILE = float(os.environ.get('HEDGE_PERCENTILE', 95))
+	HEDGE_DEFAULT_DELAY = float(os.environ.get('HEDGE_DEFAULT_DELAY', 1.0))
+	HEDGE_BUDGET_RATIO = float(os.environ.get('HEDGE_BUDGET_RATIO', 0.1))
+
+	# Conversational queries: relevant past turns plus a rolling summary,
+	# packed into a fixed history budget (roughly 4 characters per token).
+	CHAT_HISTORY_TOP_K = int(os.environ.get('CHAT_HISTORY_TOP_K', 4))
+	CHAT_HISTORY_MAX_CHARS = int(os.environ.get('CHAT_HISTORY_MAX_CHARS', 4000))
+	CHAT_SUMMARY_MAX_CHARS = int(os.environ.get('CHAT_SUMMARY_MAX_CHARS', 1200))
+
+	# Coalescing of identical in-flight Bedrock requests.
+	SINGLE_FLIGHT_ENABLED = (
+		os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+	)
+
+	# Seconds before unscored chunks fall back to a distance score, 0 disables.
+	RERANK_DEADLINE = float(os.environ.get('RERANK_DEADLINE', 0))
+
+	# Connections opened per client during Lambda init, 0 disables pre-warming.
+	PREWARM_CONNECTIONS = int(os.environ.get('PREWARM_CONNECTIONS', 0))
+
+	# Share of handler invocations profiled, 0 disables profiling. Full cProfile
+	# and tracemalloc dumps are written under PROFILE_PATH when it is set.
+	PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+	PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', 15))
+	PROFILE_PATH = os.environ.get('PROFILE_PATH')
+
+	# Chunk body storage: 'inline' keeps chunk_text in vector metadata, while
+	# 's3' and 'local' keep a compressed copy out-of-line keyed by chunk_hash.
+	CHUNK_STORE = os.environ.get('CHUNK_STORE', 'inline')
+	CHUNK_STORE_BUCKET = os.environ.get('CHUNK_STORE_BUCKET')
+	CHUNK_STORE_PREFIX = os.environ.get('CHUNK_STORE_PREFIX', 'chunks')
+	CHUNK_STORE_PATH = os.environ.get('CHUNK_STORE_PATH', '/tmp/chunk-store')
+	CHUNK_STORE_WORKERS = int(os.environ.get('CHUNK_STORE_WORKERS', 10))
+
+	# Retrieval candidate counts.
+	VECTOR_TOP_K = int(os.environ.get('VECTOR_TOP_K', 20))
+	LEXICAL_TOP_K = int(os.environ.get('LEXICAL_TOP_K', 20))
+	HYBRID_TOP_K = int(os.environ.get('HYBRID_TOP_K', 20))
+	RRF_K = int(os.environ.get('RRF_K', 60))
+
+	# BM25 index store for hybrid retrieval: 'none' disables lexical search.
+	LEXICAL_INDEX_STORE = os.environ.get('LEXICAL_INDEX_STORE', 'none')
+	LEXICAL_INDEX_BUCKET = os.environ.get('LEXICAL_INDEX_BUCKET')
+	LEXICAL_INDEX_PREFIX = os.environ.get('LEXICAL_INDEX_PREFIX', 'lexical')
+	LEXICAL_INDEX_PATH = os.environ.get('LEXICAL_INDEX_PATH', '/tmp/lexical-index')
+
+	# Adaptive top-k: fetch ADAPTIVE_CANDIDATES, then cut by distance and elbow.
+	ADAPTIVE_TOP_K_ENABLED = (
+		os.environ.get('ADAPTIVE_TOP_K_ENABLED', 'false').lower() == 'true'
+	)
+	ADAPTIVE_CANDIDATES = int(os.environ.get('ADAPTIVE_CANDIDATES', 40))
+	ADAPTIVE_MIN_K = int(os.environ.get('ADAPTIVE_MIN_K', 3))
+	ADAPTIVE_MAX_K = int(os.environ.get('ADAPTIVE_MAX_K', 20))
+	ADAPTIVE_MAX_DISTANCE = float(os.environ.get('ADAPTIVE_MAX_DISTANCE', 0.6))
+	ADAPTIVE_MIN_GAP = float(os.environ.get('ADAPTIVE_MIN_GAP', 0.05))
+
+	# Maximal Marginal Relevance diversification ahead of reranking.
+	MMR_ENABLED = os.environ.get('MMR_ENABLED', 'false').lower() == 'true'
+	MMR_LAMBDA = float(os.environ.get('MMR_LAMBDA', 0.5))
+	MMR_TOP_K = int(os.environ.get('MMR_TOP_K', 8))
+
 	@classmethod
 	def validate(cls):
 		"""Ensure all required environment variables are present.
 
-		Check for the existence of VECTOR_BUCKET and VECTOR_INDEX.
+		Check for the existence of VECTOR_BUCKET and VECTOR_INDEX, and of the
+		settings required by the selected chunk and lexical index stores.
 
 		Raises:
 				EnvironmentError: If required bucket or index names are missing.
@@ -36,3 +118,17 @@ class Config:
 		"""
 		if not cls.VECTOR_BUCKET or not cls.VECTOR_INDEX:
 			raise EnvironmentError('Missing VECTOR_BUCKET_NAME OR VECTOR_INDEX_NAME')
+
+		if cls.CHUNK_STORE not in ('inline', 's3', 'local'):
+			raise EnvironmentError(f'Unsupported CHUNK_STORE: {cls.CHUNK_STORE}')
+
+		if cls.CHUNK_STORE == 's3' and not cls.CHUNK_STORE_BUCKET:
+			raise EnvironmentError('Missing CHUNK_STORE_BUCKET for s3 chunk store')
+
+		if cls.LEXICAL_INDEX_STORE not in ('none', 's3', 'local'):
+			raise EnvironmentError(
+				f'Unsupported LEXICAL_INDEX_STORE: {cls.LEXICAL_INDEX_STORE}'
+			)
+
+		if cls.LEXICAL_INDEX_STORE == 's3' and not cls.LEXICAL_INDEX_BUCKET:
+			raise EnvironmentError('Missing LEXICAL_INDEX_BUCKET for s3 lexical index')
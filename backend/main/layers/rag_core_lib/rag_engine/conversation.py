@@ -0,0 +1,228 @@
+"""Module for bounded-context conversational queries.
+
+Conversation turns are stored as chat vectors, so a follow-up question
+only pulls in the past turns relevant to it, plus a rolling summary of
+the whole conversation. The history handed to the generator is capped
+at a fixed size however long the conversation gets.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+
+from clients.factory import get_bedrock_client, get_s3_vector_client
+from models import ChatVectorMetadata
+
+from .config import Config
+from .embedder import get_embedding
+
+bedrock_client = get_bedrock_client()
+s3vector_client = get_s3_vector_client()
+
+
+# Keys include the user, so a chat_id reused by another user can't collide.
+def _summary_key(user_id: str, chat_id: str) -> str:
+	return f'chat#{user_id}#{chat_id}#summary'
+
+
+def _turn_key(user_id: str, chat_id: str, message_index: int) -> str:
+	return f'chat#{user_id}#{chat_id}#{message_index}'
+
+
+def _get_summary(chat_id: str, user_id: str) -> dict | None:
+	response = s3vector_client.get_vectors(
+		vectorBucketName=Config.VECTOR_BUCKET,
+		indexName=Config.VECTOR_INDEX,
+		keys=[_summary_key(user_id, chat_id)],
+		returnMetadata=True,
+	)
+	vectors = response.get('vectors', [])
+	return vectors[0]['metadata'] if vectors else None
+
+
+def _search_turns(chat_id: str, user_id: str, query_embedding: list[float]) -> list:
+	response = s3vector_client.query_vectors(
+		vectorBucketName=Config.VECTOR_BUCKET,
+		indexName=Config.VECTOR_INDEX,
+		topK=Config.CHAT_HISTORY_TOP_K,
+		queryVector={'float32': query_embedding},
+		filter={
+			'$and': [
+				{'user_id': user_id},
+				{'source': 'chat'},
+				{'chat_id': chat_id},
+				{'role': {'$in': ['user', 'assistant']}},
+			],
+		},
+		returnMetadata=True,
+		returnDistance=True,
+	)
+	return [v['metadata'] for v in response.get('vectors', [])]
+
+
+def load_conversation(
+	chat_id: str,
+	user_id: str,
+	query_embedding: list[float],
+) -> dict:
+	"""Load the rolling summary and the past turns relevant to a question.
+
+	Args:
+		chat_id: The conversation identifier.
+		user_id: The user owning the conversation.
+		query_embedding: The embedding of the new question.
+
+	Returns:
+		A dictionary with the chat_id, summary text, relevant turns (in
+		conversation order) and the number of messages stored so far.
+
+	"""
+	with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+		summary_future = executor.submit(_get_summary, chat_id, user_id)
+		turns_future = executor.submit(_search_turns, chat_id, user_id, query_embedding)
+		summary = summary_future.result()
+		turns = turns_future.result()
+
+	return {
+		'chat_id': chat_id,
+		'summary': summary['chunk_text'] if summary else '',
+		'message_count': int(summary['message_index']) if summary else 0,
+		'turns': sorted(turns, key=lambda t: int(t['message_index'])),
+	}
+
+
+def build_history(conversation: dict, max_chars: int | None = None) -> str:
+	"""Pack the summary and relevant turns into a bounded history text.
+
+	The summary comes first, then the relevant turns in conversation
+	order, as many as fit within max_chars.
+
+	Args:
+		conversation: A conversation returned by load_conversation.
+		max_chars: The history budget, defaults to CHAT_HISTORY_MAX_CHARS.
+
+	Returns:
+		The history text, or an empty string for a new conversation.
+
+	"""
+	budget = max_chars or Config.CHAT_HISTORY_MAX_CHARS
+	parts = []
+	if conversation['summary']:
+		parts.append(f'Summary: {conversation["summary"]}'[:budget])
+		budget -= len(parts[0])
+
+	for turn in conversation['turns']:
+		line = f'\n{turn["role"].capitalize()}: {turn["chunk_text"]}'
+		if len(line) > budget:
+			break
+		parts.append(line)
+		budget -= len(line)
+
+	return ''.join(parts).lstrip('\n')
+
+
+def _summarize(previous_summary: str, query: str, answer: str) -> str:
+	"""Fold the latest exchange into the rolling summary with the fast model."""
+	prompt = f"""Update the running summary of a conversation between a homeowner
+    and an HOA assistant. Keep names, numbers, rules and open questions.
+    Reply with the updated summary only, in under {Config.CHAT_SUMMARY_MAX_CHARS}
+    characters.
+
+    Current summary:
+    {previous_summary or '(empty)'}
+
+    User: {query}
+    Assistant: {answer}
+    """
+
+	request = json.dumps(
+		{
+			'anthropic_version': 'bedrock-2023-05-31',
+			'max_tokens': Config.CHAT_SUMMARY_MAX_CHARS // 4,
+			'temperature': 0,
+			'messages': [{'role': 'user', 'content': [{'type': 'text', 'text': prompt}]}],
+		}
+	)
+
+	response = bedrock_client.invoke_model(
+		modelId=Config.FAST_GENERATION_MODEL,
+		body=request,
+		contentType='application/json',
+		accept='application/json',
+	)
+	response_body = json.loads(response['body'].read())
+	return response_body['content'][0]['text'].strip()[: Config.CHAT_SUMMARY_MAX_CHARS]
+
+
+def save_exchange(
+	conversation: dict,
+	user_id: str,
+	query: str,
+	query_embedding: list[float],
+	answer: str,
+) -> None:
+	"""Store the new question and answer and refresh the rolling summary.
+
+	Args:
+		conversation: The conversation returned by load_conversation.
+		user_id: The user owning the conversation.
+		query: The user's question.
+		query_embedding: The embedding of the question.
+		answer: The generated answer.
+
+	"""
+	chat_id = conversation['chat_id']
+	user_index = conversation['message_count']
+
+	with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+		answer_embedding_future = executor.submit(get_embedding, answer)
+		summary_future = executor.submit(
+			_summarize, conversation['summary'], query, answer
+		)
+		answer_embedding = answer_embedding_future.result()
+		summary = summary_future.result()
+
+	def _chat_vector(key, embedding, role, text, message_index):
+		metadata = ChatVectorMetadata(
+			user_id=user_id,
+			visibility='private',
+			chat_id=chat_id,
+			role=role,
+			message_index=str(message_index),
+			chunk_text=text,
+			chunk_hash=hashlib.md5(text.encode('utf-8')).hexdigest(),
+		)
+		return {
+			'key': key,
+			'data': {'float32': embedding},
+			'metadata': metadata.to_s3_metadata(),
+		}
+
+	s3vector_client.put_vectors(
+		vectorBucketName=Config.VECTOR_BUCKET,
+		indexName=Config.VECTOR_INDEX,
+		vectors=[
+			_chat_vector(
+				_turn_key(user_id, chat_id, user_index),
+				query_embedding,
+				'user',
+				query,
+				user_index,
+			),
+			_chat_vector(
+				_turn_key(user_id, chat_id, user_index + 1),
+				answer_embedding,
+				'assistant',
+				answer,
+				user_index + 1,
+			),
+			# The summary records how many messages it covers.
+			_chat_vector(
+				_summary_key(user_id, chat_id),
+				answer_embedding,
+				'summary',
+				summary,
+				user_index + 2,
+			),
+		],
+	)
@@ -0,0 +1,68 @@
+"""Module for choosing how many retrieved chunks are worth reranking.
+
+A focused question with a few strong hits should not pay for reranking
+a long tail of weak ones, while a broad question may need more. The
+cutoff drops candidates beyond a distance threshold and at the largest
+gap ("elbow") in the distances, within configurable bounds.
+"""
+
+
+def adaptive_cutoff(
+	chunks: list[dict],
+	min_k: int,
+	max_k: int,
+	max_distance: float,
+	min_gap: float,
+) -> tuple[list[dict], dict]:
+	"""Cut a ranked candidate list by distance threshold and elbow detection.
+
+	Chunks without a distance (e.g. lexical-only hits from hybrid search)
+	are never cut by the distance rules, only by max_k.
+
+	Args:
+		chunks: Candidates in rank order, with cosine distance under 'distance'.
+		min_k: Minimum number of chunks to keep when available.
+		max_k: Maximum number of chunks to keep.
+		max_distance: Chunks farther than this are dropped.
+		min_gap: Smallest jump between consecutive distances that counts
+			as an elbow.
+
+	Returns:
+		The kept chunks in their original order, and per-query statistics
+		with the candidate count, chosen k, cut reason and rerank calls
+		avoided.
+
+	"""
+	threshold = max_distance
+	reason = 'distance'
+
+	distances = sorted(
+		c['distance']
+		for c in chunks
+		if c.get('distance') is not None and c['distance'] <= max_distance
+	)
+	gaps = [
+		(distances[i + 1] - distances[i], i)
+		for i in range(max(min_k - 1, 0), len(distances) - 1)
+	]
+	if gaps:
+		gap, i = max(gaps)
+		if gap >= min_gap:
+			threshold = distances[i]
+			reason = 'elbow'
+
+	kept = [c for c in chunks if c.get('distance') is None or c['distance'] <= threshold]
+	if len(kept) < min_k:
+		kept = chunks[:min_k]
+		reason = 'min_k'
+	if len(kept) > max_k:
+		kept = kept[:max_k]
+		reason = 'max_k'
+
+	stats = {
+		'candidates': len(chunks),
+		'k': len(kept),
+		'cut': reason,
+		'rerank_calls_avoided': len(chunks) - len(kept),
+	}
+	return kept, stats
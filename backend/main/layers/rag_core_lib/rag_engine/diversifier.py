@@ -0,0 +1,60 @@
+"""Module for diversifying retrieved chunks with Maximal Marginal Relevance.
+
+Policy documents repeat themselves, so the nearest neighbours of a query
+are often near-copies of each other. MMR trades relevance to the query
+against similarity to already selected chunks, so fewer and more varied
+chunks are sent to the reranker.
+"""
+
+import numpy as np
+
+
+def mmr_select(
+	query_embedding: list[float],
+	chunks: list[dict],
+	top_k: int,
+	lambda_mult: float = 0.5,
+) -> list[dict]:
+	"""Select a relevant yet diverse subset of chunks.
+
+	Chunks must carry their embedding under data.float32, as returned by
+	get_vectors with returnData=True. Chunks without an embedding are
+	skipped, unless there are no more candidates than top_k.
+
+	Args:
+		query_embedding: The embedding of the user's query.
+		chunks: Candidate chunks, usually ordered by vector distance.
+		top_k: Maximum number of chunks to keep.
+		lambda_mult: Weight of query relevance versus diversity, where 1.0
+			is pure relevance and 0.0 is pure diversity.
+
+	Returns:
+		The selected chunks in selection order.
+
+	"""
+	candidates = [c for c in chunks if c.get('data', {}).get('float32')]
+	if len(candidates) <= top_k:
+		return chunks[:top_k]
+
+	embeddings = np.asarray([c['data']['float32'] for c in candidates], dtype=np.float32)
+	embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+	query = np.asarray(query_embedding, dtype=np.float32)
+	query /= np.linalg.norm(query) + 1e-12
+
+	relevance = embeddings @ query
+	similarity = embeddings @ embeddings.T
+
+	selected = [int(np.argmax(relevance))]
+	max_similarity = similarity[:, selected[0]].copy()
+	available = np.ones(len(candidates), dtype=bool)
+	available[selected[0]] = False
+
+	while len(selected) < top_k:
+		scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+		scores[~available] = -np.inf
+		best = int(np.argmax(scores))
+		selected.append(best)
+		available[best] = False
+		np.maximum(max_similarity, similarity[:, best], out=max_similarity)
+
+	return [candidates[i] for i in selected]
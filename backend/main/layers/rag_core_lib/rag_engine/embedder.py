@@ -5,9 +5,32 @@ import json
 from clients.factory import get_bedrock_client
 
 from .config import Config
+from .hedging import get_hedger
+from .single_flight import get_single_flight
 
 bedrock_client = get_bedrock_client()
 
+_hedger = get_hedger('embed', max_workers=4)
+
+_single_flight = get_single_flight('embed')
+
+
+def _invoke_embedding_model(body: str) -> list[float]:
+	"""Invoke the embedding model and return the embedding."""
+	response = bedrock_client.invoke_model(
+		modelId=Config.EMBEDDING_MODEL,
+		body=body,
+		contentType='application/json',
+	)
+	return json.loads(response['body'].read())['embedding']
+
+
+def _call_embedding_model(body: str) -> list[float]:
+	"""Invoke the embedding model, hedging the call when enabled."""
+	if _hedger:
+		return _hedger.call(_invoke_embedding_model, body)
+	return _invoke_embedding_model(body)
+
 
 def get_embedding(text: str):
 	"""Generate a 1024-dimensional vector embedding for the given text.
@@ -29,9 +52,7 @@ def get_embedding(text: str):
 		}
 	)
 
-	response = bedrock_client.invoke_model(
-		modelId=Config.EMBEDDING_MODEL,
-		body=body,
-		contentType='application/json',
-	)
-	return json.loads(response['body'].read())['embedding']
+	# Identical texts in flight at the same time share one call.
+	if _single_flight:
+		return _single_flight.do(body, _call_embedding_model, body)
+	return _call_embedding_model(body)
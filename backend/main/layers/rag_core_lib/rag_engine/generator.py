@@ -1,30 +1,52 @@
 """Module for generating RAG-based answers using Amazon Bedrock."""
 
 import json
+import time
 
 from clients.factory import get_bedrock_client
 
 from .config import Config
+from .router import route_generation
+from .single_flight import get_single_flight
 
 bedrock_client = get_bedrock_client()
 
+_single_flight = get_single_flight('generate')
 
-def generate_answer(query: str, context_chunks: list) -> str:
+
+def _invoke_generation_model(model_id: str, request: str) -> str:
+	"""Invoke a generation model and return the answer text."""
+	response = bedrock_client.invoke_model(
+		modelId=model_id,
+		body=request,
+		contentType='application/json',
+		accept='application/json',
+	)
+
+	response_body = json.loads(response.get('body').read())
+	return response_body['content'][0]['text'].strip()
+
+
+def generate_answer(query: str, context_chunks: list, history: str = '') -> str:
 	"""Synthesize a final answer based on provided source context.
 
 	Assemble context chunks into a numbered list, construct a focused
 	instructional prompt for the LLM, and return the generated
-	text response.
+	text response. The model and output budget are chosen by
+	route_generation.
 
 	Args:
 		query: The user's original question.
 		context_chunks: A list of retrieved and reranked text segments.
+		history: Bounded conversation history for follow-up questions.
 
 	Returns:
 		A string containing the synthesized answer or a fallback
 		message if information is missing.
 
 	"""
+	route = route_generation(context_chunks)
+
 	context_text = '\n\n'.join(
 		[
 			f'Source {i + 1}: {c["metadata"]["chunk_text"]}'
@@ -32,6 +54,13 @@ def generate_answer(query: str, context_chunks: list) -> str:
 		]
 	)
 
+	history_text = (
+		'\n\n    Conversation so far (use it only to understand the question):\n'
+		f'    {history}'
+		if history
+		else ''
+	)
+
 	prompt = f"""You are an assistant for homeowners and HOA members.
 
     Use ONLY the provided context to answer.
@@ -40,7 +69,7 @@ def generate_answer(query: str, context_chunks: list) -> str:
     "I don’t have enough information to answer that."
 
     Context:
-    {context_text}
+    {context_text}{history_text}
 
     Question: {query}
 
@@ -50,7 +79,7 @@ def generate_answer(query: str, context_chunks: list) -> str:
 	request = json.dumps(
 		{
 			'anthropic_version': 'bedrock-2023-05-31',
-			'max_tokens': 512,
+			'max_tokens': route['max_tokens'],
 			'temperature': 0.5,
 			'messages': [
 				{
@@ -61,12 +90,17 @@ def generate_answer(query: str, context_chunks: list) -> str:
 		}
 	)
 
-	response = bedrock_client.invoke_model(
-		modelId=Config.GENERATION_MODEL,
-		body=request,
-		contentType='application/json',
-		accept='application/json',
-	)
+	start = time.perf_counter()
 
-	response_body = json.loads(response.get('body').read())
-	return response_body['content'][0]['text'].strip()
+	# Identical questions over the same context in flight share one call.
+	if _single_flight:
+		answer = _single_flight.do(
+			(route['model'], request), _invoke_generation_model, route['model'], request
+		)
+	else:
+		answer = _invoke_generation_model(route['model'], request)
+
+	# Log the routing signals with latency so thresholds can be tuned offline.
+	route['latency_ms'] = round((time.perf_counter() - start) * 1000)
+	print(json.dumps({'generation_route': route}))
+	return answer
@@ -0,0 +1,193 @@
+"""Module for hedging slow, idempotent Bedrock calls.
+
+A query waits for the slowest of its parallel rerank calls, so a single
+slow response sets its latency. A hedged call issues a duplicate when the
+original has not finished within a percentile of recent latencies, and
+returns whichever finishes first. A budget shared by all hedgers caps the
+extra load hedging may add.
+"""
+
+import concurrent.futures
+import threading
+import time
+from collections import deque
+
+from .config import Config
+
+
+class LatencyTracker:
+	"""Keep a rolling window of call latencies."""
+
+	def __init__(self, window: int = 200, min_samples: int = 20):
+		"""Initialize an empty window.
+
+		Args:
+			window: Number of most recent latencies kept.
+			min_samples: Samples required before percentiles are reported.
+
+		"""
+		self._samples = deque(maxlen=window)
+		self._min_samples = min_samples
+		self._lock = threading.Lock()
+
+	def record(self, seconds: float) -> None:
+		"""Add a latency sample."""
+		with self._lock:
+			self._samples.append(seconds)
+
+	def percentile(self, pct: float) -> float | None:
+		"""Return the given percentile, or None until enough samples exist."""
+		with self._lock:
+			if len(self._samples) < self._min_samples:
+				return None
+			samples = sorted(self._samples)
+		return samples[min(int(len(samples) * pct / 100), len(samples) - 1)]
+
+
+class HedgeBudget:
+	"""Limit hedges to a fraction of requests with a token bucket."""
+
+	def __init__(self, ratio: float, burst: float = 10.0):
+		"""Initialize the budget.
+
+		Args:
+			ratio: Hedges allowed per request, e.g. 0.1 for 10% extra load.
+			burst: Maximum hedges that can be saved up during quiet periods.
+
+		"""
+		self._ratio = ratio
+		self._burst = burst
+		self._tokens = burst
+		self._lock = threading.Lock()
+
+	def on_request(self) -> None:
+		"""Earn hedge allowance for a primary request."""
+		with self._lock:
+			self._tokens = min(self._burst, self._tokens + self._ratio)
+
+	def try_acquire(self) -> bool:
+		"""Spend allowance for one hedge, if available."""
+		with self._lock:
+			if self._tokens < 1:
+				return False
+			self._tokens -= 1
+			return True
+
+
+class Hedger:
+	"""Run calls with a delayed duplicate when they are slower than usual."""
+
+	def __init__(
+		self,
+		name: str,
+		budget: HedgeBudget,
+		max_workers: int,
+		percentile: float = 95,
+		default_delay: float = 1.0,
+		window: int = 200,
+	):
+		"""Initialize a hedger for one kind of call.
+
+		Args:
+			name: Name used in logs and stats.
+			budget: The budget shared by all hedgers.
+			max_workers: Threads available for primaries and hedges.
+			percentile: Latency percentile after which a hedge is issued.
+			default_delay: Hedge delay in seconds until enough latencies
+				have been recorded.
+			window: Number of recent latencies kept.
+
+		"""
+		self.name = name
+		self._budget = budget
+		self._executor = concurrent.futures.ThreadPoolExecutor(
+			max_workers=max_workers, thread_name_prefix=f'hedge-{name}'
+		)
+		self._tracker = LatencyTracker(window)
+		self._percentile = percentile
+		self._default_delay = default_delay
+		self._lock = threading.Lock()
+		self.calls = 0
+		self.hedges = 0
+		self.hedge_wins = 0
+
+	def _submit(self, fn, *args, **kwargs) -> concurrent.futures.Future:
+		start = time.perf_counter()
+		future = self._executor.submit(fn, *args, **kwargs)
+		future.add_done_callback(
+			lambda f: self._tracker.record(time.perf_counter() - start)
+		)
+		return future
+
+	def call(self, fn, *args, **kwargs):
+		"""Call fn, hedging it if it is slow and the budget allows.
+
+		fn must be idempotent, since it may run twice.
+
+		Returns:
+			The result of the first call to succeed.
+
+		Raises:
+			Exception: The first error, if every issued call fails.
+
+		"""
+		with self._lock:
+			self.calls += 1
+		self._budget.on_request()
+		primary = self._submit(fn, *args, **kwargs)
+
+		delay = self._tracker.percentile(self._percentile) or self._default_delay
+		done, _ = concurrent.futures.wait([primary], timeout=delay)
+		pending = {primary}
+		if not done and self._budget.try_acquire():
+			with self._lock:
+				self.hedges += 1
+			pending.add(self._submit(fn, *args, **kwargs))
+
+		error = None
+		while pending:
+			done, pending = concurrent.futures.wait(
+				pending, return_when=concurrent.futures.FIRST_COMPLETED
+			)
+			for future in done:
+				if future.exception() is None:
+					if future is not primary:
+						with self._lock:
+							self.hedge_wins += 1
+					return future.result()
+				error = error or future.exception()
+		raise error
+
+	def stats(self) -> dict:
+		"""Return call, hedge and hedge win counts."""
+		return {
+			'calls': self.calls,
+			'hedges': self.hedges,
+			'hedge_wins': self.hedge_wins,
+		}
+
+
+# A single budget caps hedging across every hedged call in the container.
+_budget = HedgeBudget(Config.HEDGE_BUDGET_RATIO)
+
+
+def get_hedger(name: str, max_workers: int) -> Hedger | None:
+	"""Return a hedger sharing the global budget, or None if hedging is off.
+
+	Args:
+		name: Name of the hedged call.
+		max_workers: Threads available for primaries and hedges.
+
+	Returns:
+		A Hedger, or None when HEDGING_ENABLED is not set.
+
+	"""
+	if not Config.HEDGING_ENABLED:
+		return None
+	return Hedger(
+		name,
+		_budget,
+		max_workers=max_workers,
+		percentile=Config.HEDGE_PERCENTILE,
+		default_delay=Config.HEDGE_DEFAULT_DELAY,
+	)
@@ -0,0 +1,282 @@
+"""Module for BM25 lexical search over ingested chunks.
+
+Exact-term questions (section numbers, form names, street names) are
+poorly served by embeddings alone. This module keeps a per-scope inverted
+index that the ingest handler updates incrementally, and persists it to
+a pluggable store so the query handler can search it next to the vector
+index.
+"""
+
+import fcntl
+import json
+import math
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+
+from botocore.exceptions import ClientError
+from clients.factory import get_s3_client
+
+from .chunker import clean_data
+from .config import Config
+
+_TOKEN_PATTERN = re.compile(r'\w+(?:\.\w+)*')
+
+
+def tokenize(text: str) -> list[str]:
+	"""Split text into lowercase terms, keeping dotted numbers like 4.2 whole.
+
+	Args:
+		text: Text already normalized with clean_data.
+
+	Returns:
+		The list of terms in order of appearance.
+
+	"""
+	return _TOKEN_PATTERN.findall(text.lower())
+
+
+class LexicalIndex:
+	"""Represent an in-memory BM25 inverted index keyed by vector key."""
+
+	def __init__(
+		self,
+		postings: dict[str, dict[str, int]] | None = None,
+		doc_lengths: dict[str, int] | None = None,
+		k1: float = 1.5,
+		b: float = 0.75,
+	):
+		"""Initialize the index, optionally from previously saved state.
+
+		Args:
+			postings: A mapping of term to {vector key: term frequency}.
+			doc_lengths: A mapping of vector key to its number of terms.
+			k1: BM25 term frequency saturation.
+			b: BM25 document length normalization.
+
+		"""
+		self.postings = postings or {}
+		self.doc_lengths = doc_lengths or {}
+		self._k1 = k1
+		self._b = b
+
+	def add(self, key: str, text: str) -> None:
+		"""Index a chunk under its vector key; already indexed keys are ignored.
+
+		Args:
+			key: The vector key the chunk was stored under.
+			text: The cleaned chunk text.
+
+		"""
+		if key in self.doc_lengths:
+			return
+
+		terms = tokenize(text)
+		self.doc_lengths[key] = len(terms)
+		for term, frequency in Counter(terms).items():
+			self.postings.setdefault(term, {})[key] = frequency
+
+	def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+		"""Rank indexed chunks against a query with BM25.
+
+		Args:
+			query: The raw user query; it is cleaned like ingested text.
+			top_k: Maximum number of results.
+
+		Returns:
+			(vector key, score) pairs ordered by descending score.
+
+		"""
+		total_docs = len(self.doc_lengths)
+		if not total_docs:
+			return []
+
+		average_length = sum(self.doc_lengths.values()) / total_docs
+		scores = Counter()
+		for term in set(tokenize(clean_data(query))):
+			postings = self.postings.get(term)
+			if not postings:
+				continue
+
+			idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+			for key, frequency in postings.items():
+				norm = 1 - self._b + self._b * self.doc_lengths[key] / average_length
+				scores[key] += (
+					idf * frequency * (self._k1 + 1) / (frequency + self._k1 * norm)
+				)
+
+		return scores.most_common(top_k)
+
+	def to_bytes(self) -> bytes:
+		"""Serialize the index as compressed JSON."""
+		state = {'postings': self.postings, 'doc_lengths': self.doc_lengths}
+		return zlib.compress(json.dumps(state, separators=(',', ':')).encode('utf-8'))
+
+	@classmethod
+	def from_bytes(cls, blob: bytes) -> 'LexicalIndex':
+		"""Deserialize an index written by to_bytes."""
+		state = json.loads(zlib.decompress(blob).decode('utf-8'))
+		return cls(postings=state['postings'], doc_lengths=state['doc_lengths'])
+
+
+class LexicalIndexStore(ABC):
+	"""Define the interface for persisting per-scope lexical indexes."""
+
+	@abstractmethod
+	def load(self, scope: str) -> LexicalIndex:
+		"""Load the index for a scope, or an empty index if none exists.
+
+		Args:
+			scope: The visibility scope, see get_scope.
+
+		Returns:
+			The lexical index for the scope.
+
+		"""
+
+	@abstractmethod
+	def add_documents(self, scope: str, documents: dict[str, str]) -> None:
+		"""Add chunks to a scope's index without losing concurrent updates.
+
+		Args:
+			scope: The visibility scope, see get_scope.
+			documents: A mapping of vector key to cleaned chunk text.
+
+		"""
+
+
+class LocalLexicalIndexStore(LexicalIndexStore):
+	"""Persist lexical indexes on the local filesystem."""
+
+	def __init__(self, root: str):
+		"""Initialize the store under the given root directory.
+
+		Args:
+			root: The directory where indexes are written.
+
+		"""
+		self._root = root
+
+	def _path(self, scope: str) -> str:
+		return os.path.join(self._root, scope, 'index.json.z')
+
+	def load(self, scope: str) -> LexicalIndex:
+		"""Read the index from disk."""
+		try:
+			with open(self._path(scope), 'rb') as f:
+				return LexicalIndex.from_bytes(f.read())
+		except FileNotFoundError:
+			return LexicalIndex()
+
+	def add_documents(self, scope: str, documents: dict[str, str]) -> None:
+		"""Update the index on disk under an exclusive file lock."""
+		path = self._path(scope)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(f'{path}.lock', 'w') as lock:
+			fcntl.flock(lock, fcntl.LOCK_EX)
+			index = self.load(scope)
+			for key, text in documents.items():
+				index.add(key, text)
+			with open(f'{path}.tmp', 'wb') as f:
+				f.write(index.to_bytes())
+			os.replace(f'{path}.tmp', path)
+
+
+class S3LexicalIndexStore(LexicalIndexStore):
+	"""Persist lexical indexes as S3 objects with optimistic concurrency."""
+
+	def __init__(self, bucket: str, prefix: str = 'lexical', max_attempts: int = 5):
+		"""Initialize the store for the given bucket and key prefix.
+
+		Args:
+			bucket: The S3 bucket holding the indexes.
+			prefix: The key prefix under which indexes are written.
+			max_attempts: Attempts per update when a concurrent writer wins.
+
+		"""
+		self._bucket = bucket
+		self._prefix = prefix
+		self._max_attempts = max_attempts
+		self._client = get_s3_client()
+		# Indexes cached by scope as (etag, index) across warm invocations.
+		self._cache = {}
+
+	def _key(self, scope: str) -> str:
+		return f'{self._prefix}/{scope}/index.json.z'
+
+	def _fetch(self, scope: str) -> tuple[str | None, LexicalIndex]:
+		cached_etag, cached_index = self._cache.get(scope, (None, None))
+		params = {'Bucket': self._bucket, 'Key': self._key(scope)}
+		if cached_etag:
+			params['IfNoneMatch'] = cached_etag
+
+		try:
+			response = self._client.get_object(**params)
+		except ClientError as e:
+			code = e.response.get('Error', {}).get('Code')
+			if code in ('304', 'NotModified'):
+				return cached_etag, cached_index
+			if code in ('NoSuchKey', '404'):
+				return None, LexicalIndex()
+			raise e
+
+		index = LexicalIndex.from_bytes(response['Body'].read())
+		self._cache[scope] = (response['ETag'], index)
+		return response['ETag'], index
+
+	def load(self, scope: str) -> LexicalIndex:
+		"""Fetch the index, reusing the cached copy if it is unchanged."""
+		return self._fetch(scope)[1]
+
+	def add_documents(self, scope: str, documents: dict[str, str]) -> None:
+		"""Update the index with conditional writes, retrying on conflicts.
+
+		Raises:
+			ClientError: If the update keeps conflicting after max_attempts.
+
+		"""
+		for attempt in range(self._max_attempts):
+			etag, index = self._fetch(scope)
+			# The cached index is shared with readers, so update a copy.
+			index = LexicalIndex.from_bytes(index.to_bytes())
+			for key, text in documents.items():
+				index.add(key, text)
+
+			condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+			try:
+				self._client.put_object(
+					Bucket=self._bucket,
+					Key=self._key(scope),
+					Body=index.to_bytes(),
+					ContentType='application/octet-stream',
+					**condition,
+				)
+				return
+			except ClientError as e:
+				code = e.response.get('Error', {}).get('Code')
+				if (
+					code in ('PreconditionFailed', 'ConditionalRequestConflict')
+					and attempt < self._max_attempts - 1
+				):
+					print(f'Lexical index changed concurrently. Retrying ({scope})...')
+					continue
+				raise e
+
+
+def get_lexical_index_store() -> LexicalIndexStore | None:
+	"""Return the configured lexical index store.
+
+	Returns:
+		A LexicalIndexStore instance, or None when hybrid search is off.
+
+	"""
+	if Config.LEXICAL_INDEX_STORE == 's3':
+		return S3LexicalIndexStore(
+			Config.LEXICAL_INDEX_BUCKET,
+			prefix=Config.LEXICAL_INDEX_PREFIX,
+		)
+	if Config.LEXICAL_INDEX_STORE == 'local':
+		return LocalLexicalIndexStore(Config.LEXICAL_INDEX_PATH)
+	return None
@@ -0,0 +1,209 @@
+"""Module for text normalization with source offsets.
+
+clean_data applies four regex substitutions in turn and keeps no link
+back to the original text. This module applies the same substitutions,
+in the same order and with the same patterns, and records where every
+cleaned character came from, so chunks can cite their location in the
+source document. Using clean_data's own patterns keeps the output, and
+the matching cost, identical to clean_data's.
+
+Recording offsets takes about twice clean_data's time, though less peak
+memory, so clean_data remains the choice when offsets aren't needed.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+
+# clean_data's substitutions, in order. Whitespace runs are collapsed in two
+# steps, so only the runs that change length are recorded as edits.
+_TOC_LEADER = re.compile(r'(?:\.\s?){3,}\s*\d*')
+_BROKEN_HYPHEN = re.compile(r'(\w+)-\s+(\w+)')
+_STRIPPED = re.compile(r'[^\w\s.,?!]+')
+_SPACE_RUN = re.compile(r'\s{2,}')
+_OTHER_SPACE = re.compile(r'[^\S ]')
+
+
+class OffsetMap:
+	"""Map positions in normalized text back to the source text.
+
+	The map is stored as runs: cleaned_starts[i] maps to source_starts[i],
+	and the following characters of the run map to consecutive source
+	positions. Two integer arrays of one entry per edit keep it compact.
+	"""
+
+	def __init__(self, cleaned_starts: array, source_starts: array, length: int):
+		"""Initialize the map from its runs.
+
+		Args:
+			cleaned_starts: Start of each run in the normalized text, ascending.
+			source_starts: Source position of the start of each run.
+			length: Length of the normalized text.
+
+		"""
+		self.cleaned_starts = cleaned_starts
+		self.source_starts = source_starts
+		self.length = length
+
+	def to_source(self, index: int) -> int:
+		"""Return the source position of a normalized character.
+
+		Characters that replace a run of whitespace or a TOC leader map to
+		the start of what they replace.
+
+		Args:
+			index: A position in the normalized text.
+
+		Returns:
+			The corresponding position in the source text.
+
+		Raises:
+			IndexError: If index is outside the normalized text.
+
+		"""
+		if not 0 <= index < self.length:
+			raise IndexError(f'offset {index} outside normalized text')
+		run = bisect_right(self.cleaned_starts, index) - 1
+		return self.source_starts[run] + index - self.cleaned_starts[run]
+
+	def source_span(self, start: int, end: int) -> tuple[int, int]:
+		"""Return the source span covering a normalized span.
+
+		Args:
+			start: Start of the normalized span.
+			end: End of the normalized span, exclusive.
+
+		Returns:
+			The source start and exclusive end.
+
+		"""
+		if end <= start:
+			source_start = self.to_source(start)
+			return source_start, source_start
+		return self.to_source(start), self.to_source(end - 1) + 1
+
+
+def _add_run(offsets: OffsetMap, cleaned_start: int, source_start: int) -> None:
+	# A run starting where the last one starts replaces it.
+	if offsets.cleaned_starts and offsets.cleaned_starts[-1] == cleaned_start:
+		offsets.source_starts[-1] = source_start
+	else:
+		offsets.cleaned_starts.append(cleaned_start)
+		offsets.source_starts.append(source_start)
+
+
+def _substitute(pattern: re.Pattern, edit, text: str) -> tuple[str, OffsetMap]:
+	"""Apply one substitution, mapping its output back to its input.
+
+	Args:
+		pattern: The pattern to replace.
+		edit: Function returning the (start, end, replacement) of the edit a
+			match makes; text inside the match but outside the edit is kept.
+		text: The input text.
+
+	Returns:
+		The substituted text and a map from its positions to positions in
+		text.
+
+	"""
+	offsets = OffsetMap(array('I', [0]), array('I', [0]), 0)
+	# Output length minus input length consumed so far.
+	delta = 0
+
+	def _replace(match: re.Match) -> str:
+		nonlocal delta
+		start, end, replacement = edit(match)
+		if replacement:
+			_add_run(offsets, start + delta, start)
+		delta += len(replacement) - end + start
+		_add_run(offsets, end + delta, end)
+		return text[match.start() : start] + replacement + text[end : match.end()]
+
+	substituted = pattern.sub(_replace, text)
+	offsets.length = len(substituted)
+	return substituted, offsets
+
+
+def _compose(outer: OffsetMap, inner: OffsetMap) -> OffsetMap:
+	"""Chain a map from a text to its input with a map from that input on."""
+	composed = OffsetMap(array('I'), array('I'), outer.length)
+	run = 0
+	for index, start in enumerate(outer.cleaned_starts):
+		end = (
+			outer.cleaned_starts[index + 1]
+			if index + 1 < len(outer.cleaned_starts)
+			else outer.length
+		)
+		if end <= start:
+			continue
+
+		# Split the outer run wherever an inner run starts inside its span.
+		position = outer.source_starts[index]
+		limit = position + end - start
+		while (
+			run + 1 < len(inner.cleaned_starts)
+			and inner.cleaned_starts[run + 1] <= position
+		):
+			run += 1
+		while True:
+			_add_run(
+				composed,
+				start,
+				inner.source_starts[run] + position - inner.cleaned_starts[run],
+			)
+			if (
+				run + 1 < len(inner.cleaned_starts)
+				and inner.cleaned_starts[run + 1] < limit
+			):
+				run += 1
+				start += inner.cleaned_starts[run] - position
+				position = inner.cleaned_starts[run]
+			else:
+				break
+	return composed
+
+
+_STAGES = (
+	(_TOC_LEADER, lambda m: (m.start(), m.end(), ' ')),
+	# Only the hyphen and whitespace are removed; the words are kept.
+	(_BROKEN_HYPHEN, lambda m: (m.end(1), m.start(2), '')),
+	(_STRIPPED, lambda m: (m.start(), m.end(), '')),
+	(_SPACE_RUN, lambda m: (m.start(), m.end(), ' ')),
+)
+
+
+def normalize(text: str) -> tuple[str, OffsetMap]:
+	"""Standardize raw text like clean_data, keeping source offsets.
+
+	Args:
+		text: The raw input string to be cleaned.
+
+	Returns:
+		The string clean_data would return, and a map from its positions
+		to positions in text.
+
+	"""
+	offsets = None
+	for pattern, edit in _STAGES:
+		text, stage_offsets = _substitute(pattern, edit, text)
+		offsets = stage_offsets if offsets is None else _compose(stage_offsets, offsets)
+
+	# What is left of the whitespace is single characters, replaced in place.
+	text = _OTHER_SPACE.sub(' ', text)
+	cleaned = text.strip()
+	if text.startswith(' '):
+		# Collapsing leaves at most one leading space to skip.
+		skip = OffsetMap(array('I', [0]), array('I', [1]), len(cleaned))
+		offsets = _compose(skip, offsets)
+	offsets.length = len(cleaned)
+
+	lowered = cleaned.lower()
+	if len(lowered) == len(cleaned):
+		return lowered, offsets
+
+	# A few characters lowercase to more than one, e.g. 'İ'; fall back to a
+	# run per character.
+	expanded = array('I')
+	for index, character in enumerate(cleaned):
+		expanded.extend([offsets.to_source(index)] * len(character.lower()))
+	return lowered, OffsetMap(array('I', range(len(expanded))), expanded, len(expanded))
@@ -0,0 +1,143 @@
+"""Module for chunking many documents across a pool of worker processes.
+
+Cleaning and chunking are CPU-bound, so bulk ingestion outside Lambda
+spreads documents over one process per core. Very large documents are
+also cleaned in pieces, split at paragraph breaks that none of the
+clean_data rules can match across. The pieces are rejoined before
+chunking, since the chunker's boundaries depend on all the text before
+them. Results are streamed back in input order and are identical to
+calling get_chunks on each document.
+"""
+
+import concurrent.futures
+import os
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+from .chunker import chunk_cleaned, clean_data, get_chunks
+from .config import Config
+
+# A whitespace run holding a blank line. The character before it must not be
+# '.', '-' or a digit: those can end a TOC leader or a broken hyphen, whose
+# rules in clean_data would otherwise join text across the break.
+_PARAGRAPH_BREAK = re.compile(r'(?<=[^\s.\-\d])[^\S\n]*\n\s*\n\s*')
+
+
+def split_paragraphs(text: str, max_chars: int) -> list[str]:
+	"""Split raw text into pieces that can be cleaned independently.
+
+	Joining the cleaned pieces with a single space, skipping empty ones,
+	gives the same result as cleaning the whole text.
+
+	Args:
+		text: The raw input string.
+		max_chars: Minimum size of a piece before it is cut at the next
+			safe paragraph break.
+
+	Returns:
+		The pieces of text, without the whitespace between them.
+
+	"""
+	pieces = []
+	start = 0
+	for match in _PARAGRAPH_BREAK.finditer(text):
+		if match.start() - start >= max_chars:
+			pieces.append(text[start : match.start()])
+			start = match.end()
+	pieces.append(text[start:])
+	return pieces
+
+
+class _Document:
+	"""Track the pending work for one document."""
+
+	def __init__(self, chunks=None, pieces=None):
+		self.chunks = chunks
+		self.pieces = pieces
+
+
+class ChunkingPool:
+	"""Chunk documents in worker processes, streaming results in order."""
+
+	def __init__(
+		self,
+		max_workers: int | None = None,
+		split_chars: int | None = None,
+		window: int | None = None,
+	):
+		"""Start the worker processes.
+
+		Args:
+			max_workers: Worker processes, defaults to CHUNKING_WORKERS or
+				one per core.
+			split_chars: Documents longer than this are cleaned in pieces,
+				defaults to CHUNKING_SPLIT_CHARS.
+			window: Documents in flight at once, defaults to four per worker.
+				It bounds memory use when the input is a long stream.
+
+		"""
+		self.max_workers = max_workers or Config.CHUNKING_WORKERS or os.cpu_count()
+		self._split_chars = split_chars or Config.CHUNKING_SPLIT_CHARS
+		self._window = window or self.max_workers * 4
+		self._executor = concurrent.futures.ProcessPoolExecutor(
+			max_workers=self.max_workers
+		)
+
+	def __enter__(self) -> 'ChunkingPool':
+		"""Return the pool for use in a with block."""
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		"""Stop the worker processes when the with block ends."""
+		self.close()
+
+	def close(self) -> None:
+		"""Stop the worker processes, dropping work not yet started."""
+		self._executor.shutdown(cancel_futures=True)
+
+	def _submit(self, text: str) -> _Document:
+		if len(text) > self._split_chars:
+			pieces = split_paragraphs(text, self._split_chars)
+			if len(pieces) > 1:
+				return _Document(
+					pieces=[self._executor.submit(clean_data, p) for p in pieces]
+				)
+		return _Document(chunks=self._executor.submit(get_chunks, text))
+
+	def _chunk_when_cleaned(self, document: _Document, wait: bool = False) -> None:
+		if document.chunks is not None:
+			return
+		if not wait and not all(piece.done() for piece in document.pieces):
+			return
+
+		cleaned = ' '.join(filter(None, (piece.result() for piece in document.pieces)))
+		document.chunks = self._executor.submit(chunk_cleaned, cleaned)
+		document.pieces = None
+
+	def _next_result(self, pending: deque) -> list:
+		document = pending.popleft()
+		# Queue chunking for large documents as soon as their pieces are clean.
+		for other in pending:
+			self._chunk_when_cleaned(other)
+		self._chunk_when_cleaned(document, wait=True)
+		return document.chunks.result()
+
+	def chunk_documents(self, texts: Iterable[str]) -> Iterator[list]:
+		"""Chunk documents in parallel.
+
+		Args:
+			texts: The raw documents; may be a lazy iterable.
+
+		Yields:
+			The chunks of each document, in input order, as get_chunks
+			would return them.
+
+		"""
+		pending = deque()
+		for text in texts:
+			pending.append(self._submit(text))
+			if len(pending) > self._window:
+				yield self._next_result(pending)
+		while pending:
+			yield self._next_result(pending)
@@ -0,0 +1,192 @@
+"""Module for sampled profiling of Lambda handler invocations.
+
+A sampled invocation runs under cProfile and tracemalloc, and a compact
+JSON summary of where its time and memory went is printed to the logs.
+Full dumps can also be written to a local path for offline analysis
+with pstats or tracemalloc. When the sample rate is 0 the decorator
+returns the handler unchanged, so disabled profiling costs nothing.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+from .config import Config
+
+# Before Python 3.12 a profiler only sees the thread that enabled it, so
+# threads started during the invocation, such as the reranker pool, get
+# their own, which they drop on their first call after the invocation.
+# From 3.12 one profiler sees every thread.
+_PER_THREAD = sys.version_info < (3, 12)
+
+# Only one invocation at a time can be profiled.
+_ACTIVE = threading.Lock()
+
+_TRACEMALLOC_FILTERS = (
+	tracemalloc.Filter(False, tracemalloc.__file__),
+	tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+	tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+	tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _profile_thread(profiles: list, active: threading.Event, *args):
+	# Called on the first event of each thread started during the invocation.
+	sys.setprofile(None)
+	if not active.is_set():
+		return
+
+	profile = cProfile.Profile()
+	profiles.append(profile)
+	previous_trace = sys.gettrace()
+
+	def _stop_after_invocation(frame, event, arg):
+		# Pool threads outlive the invocation, and a profiler can only be
+		# removed from its own thread, so check on every call in the thread.
+		if not active.is_set():
+			profile.disable()
+			sys.settrace(previous_trace)
+		return previous_trace(frame, event, arg) if previous_trace else None
+
+	sys.settrace(_stop_after_invocation)
+	profile.enable()
+
+
+def _function_label(key: tuple) -> str:
+	filename, line, name = key
+	if filename == '~':
+		return name
+	return f'{os.path.basename(filename)}:{line}({name})'
+
+
+def _top_functions(stats: pstats.Stats, column: int, top_n: int) -> list:
+	# pstats rows are (primitive calls, calls, self time, cumulative time, callers).
+	rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)
+	return [
+		[_function_label(key), row[1], round(row[column], 4)] for key, row in rows[:top_n]
+	]
+
+
+def _summarize(
+	name: str,
+	request_id: str,
+	seconds: float,
+	profiles: list,
+	snapshot: tracemalloc.Snapshot,
+	peak: int,
+) -> None:
+	"""Print a summary of a profiled invocation and write the optional dumps."""
+	stats = pstats.Stats(profiles[0])
+	for profile in profiles[1:]:
+		stats.add(profile)
+	allocations = snapshot.filter_traces(_TRACEMALLOC_FILTERS).statistics('lineno')
+
+	summary = {
+		'handler': name,
+		'request_id': request_id,
+		'seconds': round(seconds, 4),
+		# ru_maxrss is in kilobytes on Linux.
+		'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+		'peak_traced_mb': round(peak / 2**20, 2),
+		'top_self_time': _top_functions(stats, 2, Config.PROFILE_TOP_N),
+		'top_cumulative_time': _top_functions(stats, 3, Config.PROFILE_TOP_N),
+		# Allocated during the invocation and still held at its end.
+		'top_allocations_kb': [
+			[
+				f'{os.path.basename(a.traceback[0].filename)}:{a.traceback[0].lineno}',
+				round(a.size / 1024, 1),
+				a.count,
+			]
+			for a in allocations[: Config.PROFILE_TOP_N]
+		],
+	}
+
+	if Config.PROFILE_PATH:
+		os.makedirs(Config.PROFILE_PATH, exist_ok=True)
+		base = os.path.join(Config.PROFILE_PATH, f'{name}-{request_id}')
+		stats.dump_stats(f'{base}.prof')
+		snapshot.dump(f'{base}.tracemalloc')
+		summary['dump'] = base
+
+	print(json.dumps({'profile': summary}))
+
+
+def _run_profiled(handler, event, context):
+	name = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', handler.__qualname__)
+	request_id = getattr(context, 'aws_request_id', None) or uuid.uuid4().hex
+	profiles = [cProfile.Profile()]
+	active = threading.Event()
+	active.set()
+
+	# Leave tracing running if it was started elsewhere, e.g. PYTHONTRACEMALLOC.
+	was_tracing = tracemalloc.is_tracing()
+	if not was_tracing:
+		tracemalloc.start()
+	tracemalloc.reset_peak()
+	if _PER_THREAD:
+		threading.setprofile(functools.partial(_profile_thread, profiles, active))
+
+	start = time.perf_counter()
+	profiles[0].enable()
+	try:
+		return handler(event, context)
+	finally:
+		profiles[0].disable()
+		seconds = time.perf_counter() - start
+		active.clear()
+		if _PER_THREAD:
+			threading.setprofile(None)
+
+		# Profiling is best-effort and must not fail the invocation.
+		try:
+			snapshot = tracemalloc.take_snapshot()
+			peak = tracemalloc.get_traced_memory()[1]
+			_summarize(name, request_id, seconds, profiles, snapshot, peak)
+		except Exception as e:
+			print(f'Error writing profile: {e}')
+		finally:
+			if not was_tracing:
+				tracemalloc.stop()
+
+
+def profile_handler(handler):
+	"""Profile a sampled fraction of a Lambda handler's invocations.
+
+	Profiling is on when PROFILE_SAMPLE_RATE is above 0 at the time the
+	handler is decorated. Sampled invocations print a JSON summary with the top
+	PROFILE_TOP_N functions by self and cumulative time and the top
+	allocations, and write full dumps under PROFILE_PATH when it is set.
+	Profiling slows the sampled invocations down, tracemalloc especially.
+
+	Args:
+		handler: A function taking a Lambda event and context.
+
+	Returns:
+		The handler itself when the sample rate is 0, otherwise a wrapper
+		that profiles sampled invocations.
+
+	"""
+	if Config.PROFILE_SAMPLE_RATE <= 0:
+		return handler
+
+	@functools.wraps(handler)
+	def _profiled_handler(event, context):
+		if random.random() >= Config.PROFILE_SAMPLE_RATE:
+			return handler(event, context)
+		if not _ACTIVE.acquire(blocking=False):
+			return handler(event, context)
+		try:
+			return _run_profiled(handler, event, context)
+		finally:
+			_ACTIVE.release()
+
+	return _profiled_handler
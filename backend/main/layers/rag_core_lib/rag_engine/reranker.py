@@ -9,8 +9,35 @@ from botocore.exceptions import ClientError
 from clients.factory import get_bedrock_client
 
 from .config import Config
+from .hedging import get_hedger
+from .single_flight import get_single_flight
 
-bedrock_client = get_bedrock_client()
+# Hedges may double the number of calls in flight.
+_hedger = get_hedger('rerank', max_workers=2 * Config.RERANKER_WORKERS)
+
+bedrock_client = get_bedrock_client(
+	max_pool_connections=Config.RERANKER_WORKERS * (2 if _hedger else 1)
+)
+
+_single_flight = get_single_flight('rerank')
+
+# Chunks scoring below this are dropped after reranking.
+_MIN_SCORE = 5.0
+
+
+def _invoke_reranker(body: str) -> dict:
+	"""Invoke the reranker model and return the parsed response body."""
+	response = bedrock_client.invoke_model(
+		modelId=Config.RERANKER_MODEL, body=body, contentType='application/json'
+	)
+	return json.loads(response['body'].read().decode('utf-8'))
+
+
+def _call_reranker(body: str) -> dict:
+	"""Invoke the reranker model, hedging the call when enabled."""
+	if _hedger:
+		return _hedger.call(_invoke_reranker, body)
+	return _invoke_reranker(body)
 
 
 def _get_single_chunk_score(
@@ -47,12 +74,13 @@ def _get_single_chunk_score(
 	)
 
 	try:
-		response = bedrock_client.invoke_model(
-			modelId=Config.RERANKER_MODEL, body=body, contentType='application/json'
-		)
+		# Identical prompts in flight at the same time share one call.
+		if _single_flight:
+			response_body = _single_flight.do(body, _call_reranker, body)
+		else:
+			response_body = _call_reranker(body)
 
 		# Correct Parsing for Messages API
-		response_body = json.loads(response['body'].read().decode('utf-8'))
 		raw_text = response_body['content'][0]['text'].strip()
 
 		# Extract numeric value safely
@@ -103,11 +131,68 @@ def rerank_chunks(
 		return chunk
 
 	# Using ThreatPoolExecutor to run LLM calls in parallel.
-	with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-		scored_chunks = list(executor.map(_safe_get_score, chunks))
+	if Config.RERANK_DEADLINE:
+		scored_chunks = _score_with_deadline(
+			_safe_get_score, chunks, Config.RERANK_DEADLINE
+		)
+	else:
+		with concurrent.futures.ThreadPoolExecutor(
+			max_workers=Config.RERANKER_WORKERS
+		) as executor:
+			scored_chunks = list(executor.map(_safe_get_score, chunks))
+
+	if _hedger:
+		print(f'Rerank hedging: {_hedger.stats()}')
 
 	# Pick only the chunks with score greater than or equal to 5.0.
 	scored_chunks = [
-		chunk for chunk in scored_chunks if chunk['metadata']['rerank_score'] >= 5.0
+		chunk
+		for chunk in scored_chunks
+		if chunk['metadata']['rerank_score'] >= _MIN_SCORE
+	]
+	return scored_chunks
+
+
+def _score_with_deadline(score_fn, chunks: list[dict], deadline: float) -> list[dict]:
+	"""Score chunks in parallel, falling back to distance after the deadline.
+
+	Chunks are scored on copies, so calls still running after the deadline
+	cannot overwrite the fallback score. Chunks without a distance, such as
+	those found only by lexical search, fall back to the lowest score that
+	is kept: they were retrieved for a reason, but shouldn't outrank any
+	chunk with evidence of relevance.
+
+	Args:
+		score_fn: Function scoring a single chunk.
+		chunks: The chunks to be scored.
+		deadline: Seconds to wait for scores.
+
+	Returns:
+		The chunks in their original order, each with a rerank_score.
+
+	"""
+	executor = concurrent.futures.ThreadPoolExecutor(max_workers=Config.RERANKER_WORKERS)
+	futures = [
+		executor.submit(score_fn, {**chunk, 'metadata': dict(chunk['metadata'])})
+		for chunk in chunks
 	]
+	concurrent.futures.wait(futures, timeout=deadline)
+	executor.shutdown(wait=False, cancel_futures=True)
+
+	scored_chunks = []
+	for chunk, future in zip(chunks, futures):
+		if future.done() and not future.cancelled() and future.exception() is None:
+			scored_chunks.append(future.result())
+			continue
+
+		# Map cosine distance (0 = identical) onto the 0-10 rerank scale.
+		distance = chunk.get('distance')
+		score = _MIN_SCORE if distance is None else max(0.0, 10.0 * (1.0 - distance))
+		chunk['metadata']['rerank_score'] = round(score, 2)
+		chunk['metadata']['rerank_fallback'] = True
+		scored_chunks.append(chunk)
+
+	fallbacks = sum('rerank_fallback' in c['metadata'] for c in scored_chunks)
+	if fallbacks:
+		print(f'Rerank deadline reached: {fallbacks} chunks given fallback scores')
 	return scored_chunks
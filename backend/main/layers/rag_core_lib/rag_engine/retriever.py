@@ -0,0 +1,151 @@
+"""Module for retrieving candidate chunks from vector and lexical indexes.
+
+Vector search and BM25 search run in parallel, and their ranked lists
+are merged with Reciprocal Rank Fusion (RRF), which only needs ranks and
+so works across the two incompatible score scales.
+"""
+
+import concurrent.futures
+
+from clients.factory import get_s3_vector_client
+
+from .config import Config
+from .lexical_index import LexicalIndexStore
+
+s3vector_client = get_s3_vector_client()
+
+
+def reciprocal_rank_fusion(
+	ranked_lists: list[list[str]],
+	k: int = 60,
+) -> list[tuple[str, float]]:
+	"""Merge ranked lists of keys into one ranking.
+
+	Each key scores the sum of 1 / (k + rank) over the lists it appears in.
+
+	Args:
+		ranked_lists: Lists of keys, each ordered best first.
+		k: Damping constant that limits the weight of top ranks.
+
+	Returns:
+		(key, fused score) pairs ordered by descending score.
+
+	"""
+	scores = {}
+	for ranked in ranked_lists:
+		for rank, key in enumerate(ranked, start=1):
+			scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+	return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _query_vectors(
+	query_embedding: list[float],
+	vector_filter: dict,
+	top_k: int,
+	return_data: bool,
+) -> list[dict]:
+	response = s3vector_client.query_vectors(
+		vectorBucketName=Config.VECTOR_BUCKET,
+		indexName=Config.VECTOR_INDEX,
+		topK=top_k,
+		queryVector={'float32': query_embedding},
+		filter=vector_filter,
+		returnMetadata=True,
+		returnDistance=True,
+	)
+	vectors = response.get('vectors', [])
+	if not return_data or not vectors:
+		return vectors
+
+	# query_vectors can't return embeddings, so fetch them by key in one call.
+	response = s3vector_client.get_vectors(
+		vectorBucketName=Config.VECTOR_BUCKET,
+		indexName=Config.VECTOR_INDEX,
+		keys=[v['key'] for v in vectors],
+		returnData=True,
+		returnMetadata=False,
+	)
+	data = {v['key']: v['data'] for v in response.get('vectors', []) if 'data' in v}
+	for vector in vectors:
+		if vector['key'] in data:
+			vector['data'] = data[vector['key']]
+	return vectors
+
+
+def retrieve_candidates(
+	query: str,
+	query_embedding: list[float],
+	vector_filter: dict,
+	scope: str,
+	lexical_store: LexicalIndexStore | None = None,
+	return_data: bool = False,
+	top_k: int | None = None,
+) -> list[dict]:
+	"""Retrieve candidate chunks for a query.
+
+	Without a lexical store this is a plain vector search. With one, BM25
+	search over the scope's index runs alongside it, the two rankings are
+	fused with RRF, and chunks found only lexically are fetched by key.
+
+	Args:
+		query: The user's question.
+		query_embedding: The embedding of the question.
+		vector_filter: The metadata filter applied to vector search.
+		scope: The visibility scope of the lexical index, see get_scope.
+		lexical_store: The store holding per-scope BM25 indexes.
+		return_data: Whether to return vector embeddings with each chunk.
+		top_k: Number of vector search results, defaults to VECTOR_TOP_K.
+			Hybrid search keeps at least this many fused results, so callers
+			asking for more than HYBRID_TOP_K candidates still get them.
+
+	Returns:
+		Vector dictionaries ordered by fused rank, each with an
+		rrf_score in its metadata when hybrid search is used.
+
+	"""
+	top_k = top_k or Config.VECTOR_TOP_K
+	if lexical_store is None:
+		return _query_vectors(query_embedding, vector_filter, top_k, return_data)
+
+	with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+		vector_future = executor.submit(
+			_query_vectors,
+			query_embedding,
+			vector_filter,
+			top_k,
+			return_data,
+		)
+		lexical_future = executor.submit(
+			lambda: lexical_store.load(scope).search(query, Config.LEXICAL_TOP_K)
+		)
+		vectors = vector_future.result()
+		lexical_hits = lexical_future.result()
+
+	fused = reciprocal_rank_fusion(
+		[[v['key'] for v in vectors], [key for key, _ in lexical_hits]],
+		k=Config.RRF_K,
+	)[: max(top_k, Config.HYBRID_TOP_K)]
+
+	by_key = {v['key']: v for v in vectors}
+	missing = [key for key, _ in fused if key not in by_key]
+	if missing:
+		response = s3vector_client.get_vectors(
+			vectorBucketName=Config.VECTOR_BUCKET,
+			indexName=Config.VECTOR_INDEX,
+			keys=missing,
+			returnMetadata=True,
+			returnData=return_data,
+		)
+		by_key.update({v['key']: v for v in response.get('vectors', [])})
+
+	candidates = []
+	for key, score in fused:
+		if key in by_key:
+			by_key[key]['metadata']['rrf_score'] = score
+			candidates.append(by_key[key])
+
+	print(
+		f'Hybrid retrieval: {len(vectors)} vector, {len(lexical_hits)} lexical, '
+		f'{len(candidates)} fused ({len(missing)} fetched by key)'
+	)
+	return candidates
@@ -0,0 +1,53 @@
+"""Module for routing answer generation by query complexity.
+
+One-line factual answers drawn from a single decisive chunk don't need
+the largest model or a large output budget. The router picks the fast
+model and a smaller max_tokens when the packed context is small and the
+top rerank scores are decisive, and the default model otherwise.
+"""
+
+from .config import Config
+
+
+def route_generation(context_chunks: list[dict]) -> dict:
+	"""Choose the generation model and output budget for a context.
+
+	Args:
+		context_chunks: The reranked chunks that will be packed into the
+			prompt, best first.
+
+	Returns:
+		A routing decision with the model ID, max_tokens, the reason and
+		the signals it was based on.
+
+	"""
+	context_chars = sum(len(c['metadata']['chunk_text']) for c in context_chunks)
+	scores = sorted(
+		(c['metadata'].get('rerank_score', 0.0) for c in context_chunks), reverse=True
+	)
+	top_score = scores[0] if scores else 0.0
+	score_gap = top_score - scores[1] if len(scores) > 1 else top_score
+
+	decision = {
+		'model': Config.GENERATION_MODEL,
+		'max_tokens': Config.GENERATION_MAX_TOKENS,
+		'reason': 'routing_disabled',
+		'context_chars': context_chars,
+		'chunks': len(context_chunks),
+		'top_score': top_score,
+		'score_gap': score_gap,
+	}
+	if not Config.ROUTING_ENABLED:
+		return decision
+
+	if context_chars > Config.ROUTING_MAX_CONTEXT_CHARS:
+		decision['reason'] = 'large_context'
+	elif top_score < Config.ROUTING_MIN_TOP_SCORE:
+		decision['reason'] = 'weak_top_score'
+	elif score_gap < Config.ROUTING_MIN_SCORE_GAP:
+		decision['reason'] = 'multi_source'
+	else:
+		decision['model'] = Config.FAST_GENERATION_MODEL
+		decision['max_tokens'] = Config.FAST_GENERATION_MAX_TOKENS
+		decision['reason'] = 'decisive_small_context'
+	return decision
@@ -0,0 +1,99 @@
+"""Module for coalescing identical in-flight Bedrock requests.
+
+Under burst load a warm container can issue the same embedding, rerank
+or generation request several times at once. With single-flight, the
+first caller for a request key makes the call and concurrent callers
+with the same key wait for and share its result or exception.
+"""
+
+import concurrent.futures
+import threading
+
+from .config import Config
+
+
+class SingleFlight:
+	"""Share one in-flight call among concurrent callers with the same key."""
+
+	def __init__(self, name: str):
+		"""Initialize an empty group.
+
+		Args:
+			name: Name used in stats.
+
+		"""
+		self.name = name
+		self._lock = threading.Lock()
+		self._in_flight = {}
+		self.calls = 0
+		self.coalesced = 0
+
+	def do(self, key, fn, *args, **kwargs):
+		"""Call fn, or wait for the in-flight call with the same key.
+
+		Results are shared between callers, so they must not be mutated.
+
+		Args:
+			key: A hashable request key, e.g. the model ID and request body.
+			fn: The function making the request.
+			*args: Positional arguments for fn.
+			**kwargs: Keyword arguments for fn.
+
+		Returns:
+			The result of the shared call.
+
+		Raises:
+			Exception: The error raised by the shared call.
+
+		"""
+		with self._lock:
+			self.calls += 1
+			future = self._in_flight.get(key)
+			leader = future is None
+			if leader:
+				future = concurrent.futures.Future()
+				self._in_flight[key] = future
+			else:
+				self.coalesced += 1
+
+		if not leader:
+			return future.result()
+
+		try:
+			result = fn(*args, **kwargs)
+		except BaseException as e:
+			future.set_exception(e)
+			raise
+		else:
+			future.set_result(result)
+			return result
+		finally:
+			with self._lock:
+				del self._in_flight[key]
+
+	def stats(self) -> dict:
+		"""Return call and coalesced call counts."""
+		return {'calls': self.calls, 'coalesced': self.coalesced}
+
+
+_groups = {}
+
+
+def get_single_flight(name: str) -> SingleFlight | None:
+	"""Return the named single-flight group, or None if coalescing is off.
+
+	Args:
+		name: Name of the coalesced call.
+
+	Returns:
+		A SingleFlight, or None when SINGLE_FLIGHT_ENABLED is not set.
+
+	"""
+	if not Config.SINGLE_FLIGHT_ENABLED:
+		return None
+	return _groups.setdefault(name, SingleFlight(name))
+
+
+def single_flight_stats() -> dict:
+	"""Return the call and coalesced counts of every group."""
+	return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,12 @@
+"""Shared setup for unit tests of the rag-core Lambda layer."""
+
+import os
+import sys
+
+# The layer is deployed with its root on sys.path, so mirror that here.
+LAYER_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'layers')
+sys.path.insert(0, os.path.abspath(os.path.join(LAYER_DIR, 'rag_core_lib')))
+
+os.environ.setdefault('VECTOR_BUCKET_NAME', 'test-vector-bucket')
+os.environ.setdefault('VECTOR_INDEX_NAME', 'test-vector-index')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
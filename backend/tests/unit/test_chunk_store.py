@@ -0,0 +1,66 @@
+"""Unit tests for out-of-line chunk body storage."""
+
+import pytest
+from models import BaseVectorMetadata
+from rag_engine import ChunkStore, LocalChunkStore, get_chunk_ref, hydrate_chunks
+
+
+def test_local_chunk_store_round_trip(tmp_path):
+	"""Tests bodies are compressed on disk and read back unchanged."""
+	store = LocalChunkStore(str(tmp_path))
+	text = 'pets must be leashed in common areas. ' * 20
+	ref = get_chunk_ref('abc123', 'private', user_id='user-1')
+
+	store.put_many({ref: text})
+
+	assert (tmp_path / 'private' / 'user-1' / 'abc123.z').stat().st_size < len(text)
+	assert store.get_many([ref, 'private/user-1/missing']) == {ref: text}
+
+
+def test_chunk_store_requires_both_methods():
+	"""Tests a store missing part of the interface can't be created."""
+
+	class _WriteOnlyStore(ChunkStore):
+		def put_many(self, bodies):
+			pass
+
+	with pytest.raises(TypeError):
+		_WriteOnlyStore()
+
+
+def test_chunk_ref_scopes():
+	"""Tests references are deduplicated within their visibility scope."""
+	assert get_chunk_ref('h', 'private', user_id='u') == 'private/u/h'
+	assert get_chunk_ref('h', 'tenant', tenant_id='t') == 'tenant/t/h'
+	assert get_chunk_ref('h', 'public') == 'public/h'
+
+
+def test_hydrate_chunks_fills_referenced_bodies(tmp_path):
+	"""Tests only referenced chunks are fetched and missing bodies dropped."""
+	store = LocalChunkStore(str(tmp_path))
+	store.put_many({'public/a': 'stored body'})
+	chunks = [
+		{'key': '1', 'metadata': {'chunk_ref': 'public/a'}},
+		{'key': '2', 'metadata': {'chunk_text': 'inline body'}},
+		{'key': '3', 'metadata': {'chunk_ref': 'public/missing'}},
+	]
+
+	hydrated = hydrate_chunks(chunks, store)
+
+	assert [c['metadata']['chunk_text'] for c in hydrated] == [
+		'stored body',
+		'inline body',
+	]
+
+
+def test_metadata_requires_exactly_one_chunk_body():
+	"""Tests metadata accepts a chunk_ref in place of chunk_text."""
+	metadata = BaseVectorMetadata(
+		user_id='u', visibility='private', source='file', chunk_hash='h', chunk_ref='r'
+	)
+	assert 'chunk_text' not in metadata.to_s3_metadata()
+
+	with pytest.raises(ValueError):
+		BaseVectorMetadata(
+			user_id='u', visibility='private', source='file', chunk_hash='h'
+		)
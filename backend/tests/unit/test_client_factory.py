@@ -0,0 +1,38 @@
+"""Unit tests for the cached AWS client factory."""
+
+from clients.factory import (
+	DEFAULT_POOL_CONNECTIONS,
+	get_bedrock_client,
+	get_client,
+	prewarm_client,
+)
+
+
+def test_clients_are_cached_per_region_and_pool_size():
+	"""Tests region and pool size are part of the cache key."""
+	client = get_client('bedrock-runtime', 'us-east-1', 10)
+
+	assert get_client('bedrock-runtime', 'us-east-1', 10) is client
+	assert get_bedrock_client() is get_client(
+		'bedrock-runtime', 'us-east-1', DEFAULT_POOL_CONNECTIONS
+	)
+	assert get_client('bedrock-runtime', 'us-west-2', 10) is not client
+	assert get_client('bedrock-runtime', 'us-east-1', 20) is not client
+	assert get_client('bedrock-runtime', 'us-west-2', 10).meta.region_name == 'us-west-2'
+
+
+def test_pool_size_is_applied():
+	"""Tests max_pool_connections reaches the client's config."""
+	client = get_client('bedrock-runtime', 'us-east-1', 25)
+
+	assert client.meta.config.max_pool_connections == 25
+
+
+def test_prewarm_without_client_internals_opens_nothing(capsys):
+	"""Tests pre-warming is best-effort when botocore internals are missing."""
+
+	class _BareClient:
+		pass
+
+	assert prewarm_client(_BareClient(), 4) == 0
+	assert 'Error pre-warming' in capsys.readouterr().out
@@ -0,0 +1,200 @@
+"""Unit tests for bounded conversation history."""
+
+import concurrent.futures
+import io
+import json
+
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import ANY, Stubber
+from models import ChatVectorMetadata
+from rag_engine import (
+	Config,
+	build_history,
+	conversation,
+	load_conversation,
+	save_exchange,
+)
+
+TURN_FILTER = {
+	'$and': [
+		{'user_id': 'u'},
+		{'source': 'chat'},
+		{'chat_id': 'c'},
+		{'role': {'$in': ['user', 'assistant']}},
+	],
+}
+
+
+class _InlineExecutor(concurrent.futures.Executor):
+	"""Run submitted calls in order, so stubbed responses match their calls."""
+
+	def __init__(self, max_workers=None):
+		pass
+
+	def submit(self, fn, *args, **kwargs):
+		future = concurrent.futures.Future()
+		future.set_result(fn(*args, **kwargs))
+		return future
+
+
+@pytest.fixture
+def s3vectors(monkeypatch):
+	"""Stub the vector store and record put_vectors calls."""
+	monkeypatch.setattr(concurrent.futures, 'ThreadPoolExecutor', _InlineExecutor)
+	monkeypatch.setattr(conversation, 'get_embedding', lambda text: [0.5])
+	client = conversation.s3vector_client
+	puts = []
+
+	def _record(params, **kwargs):
+		puts.append(params)
+
+	client.meta.events.register('before-parameter-build.s3vectors.PutVectors', _record)
+	with Stubber(client) as stub:
+		yield stub, puts
+	client.meta.events.unregister('before-parameter-build.s3vectors.PutVectors', _record)
+
+
+def _summary_response(text):
+	body = json.dumps({'content': [{'type': 'text', 'text': text}]}).encode('utf-8')
+	return {
+		'body': StreamingBody(io.BytesIO(body), len(body)),
+		'contentType': 'application/json',
+	}
+
+
+def _load(stub, summary_metadata, turns):
+	stub.add_response(
+		'get_vectors',
+		{
+			'vectors': (
+				[{'key': 'chat#u#c#summary', 'metadata': summary_metadata}]
+				if summary_metadata
+				else []
+			)
+		},
+		expected_params={
+			'vectorBucketName': Config.VECTOR_BUCKET,
+			'indexName': Config.VECTOR_INDEX,
+			'keys': ['chat#u#c#summary'],
+			'returnMetadata': True,
+		},
+	)
+	stub.add_response(
+		'query_vectors',
+		{
+			'vectors': [
+				{'key': f'chat#u#c#{t["message_index"]}', 'metadata': t} for t in turns
+			],
+			'distanceMetric': 'cosine',
+		},
+		expected_params={
+			'vectorBucketName': Config.VECTOR_BUCKET,
+			'indexName': Config.VECTOR_INDEX,
+			'topK': Config.CHAT_HISTORY_TOP_K,
+			'queryVector': {'float32': [0.1]},
+			'filter': TURN_FILTER,
+			'returnMetadata': True,
+			'returnDistance': True,
+		},
+	)
+	return load_conversation('c', 'u', [0.1])
+
+
+def _turn(index, role, text):
+	return {'message_index': str(index), 'role': role, 'chunk_text': text}
+
+
+def test_history_starts_with_summary_and_keeps_turn_order():
+	"""Tests the summary leads and turns follow in conversation order."""
+	conversation = {
+		'summary': 'User asked about fence rules.',
+		'turns': [_turn(4, 'user', 'And for pools?'), _turn(5, 'assistant', 'No.')],
+	}
+
+	assert build_history(conversation, max_chars=500) == (
+		'Summary: User asked about fence rules.\nUser: And for pools?\nAssistant: No.'
+	)
+
+
+def test_history_stays_within_budget():
+	"""Tests turns that would exceed the budget are left out."""
+	conversation = {
+		'summary': 's' * 50,
+		'turns': [_turn(i, 'user', 'x' * 40) for i in range(100)],
+	}
+
+	history = build_history(conversation, max_chars=200)
+
+	assert len(history) <= 200
+	assert history.count('User:') == 3
+
+
+def test_chat_metadata_accepts_summary_role():
+	"""Tests the rolling summary can be stored as a chat vector."""
+	metadata = ChatVectorMetadata(
+		user_id='u',
+		visibility='private',
+		chat_id='c',
+		role='summary',
+		message_index='6',
+		chunk_text='summary text',
+		chunk_hash='h',
+	)
+
+	assert metadata.to_s3_metadata()['role'] == 'summary'
+
+
+def test_load_conversation_reads_only_the_users_chat(s3vectors):
+	"""Tests the summary is read by key and turns come back in order."""
+	stub, _ = s3vectors
+	turns = [_turn(5, 'assistant', 'No.'), _turn(4, 'user', 'And for pools?')]
+
+	loaded = _load(stub, {'chunk_text': 'fences', 'message_index': '6'}, turns)
+
+	stub.assert_no_pending_responses()
+	assert loaded['summary'] == 'fences'
+	assert loaded['message_count'] == 6
+	assert [t['message_index'] for t in loaded['turns']] == ['4', '5']
+
+
+def test_each_exchange_adds_two_messages(s3vectors):
+	"""Tests turns get new keys each exchange, so none are overwritten."""
+	stub, puts = s3vectors
+	bedrock_stub = Stubber(conversation.bedrock_client)
+	summary_metadata = None
+
+	with bedrock_stub:
+		for turn in range(2):
+			loaded = _load(stub, summary_metadata, [])
+			assert loaded['message_count'] == 2 * turn
+
+			bedrock_stub.add_response(
+				'invoke_model',
+				_summary_response(f'summary {turn}'),
+				{
+					'modelId': Config.FAST_GENERATION_MODEL,
+					'body': ANY,
+					'contentType': 'application/json',
+					'accept': 'application/json',
+				},
+			)
+			stub.add_response('put_vectors', {})
+			save_exchange(loaded, 'u', f'question {turn}', [0.1], f'answer {turn}')
+
+			vectors = puts[-1]['vectors']
+			assert [v['key'] for v in vectors] == [
+				f'chat#u#c#{2 * turn}',
+				f'chat#u#c#{2 * turn + 1}',
+				'chat#u#c#summary',
+			]
+			assert [v['metadata']['role'] for v in vectors] == [
+				'user',
+				'assistant',
+				'summary',
+			]
+			summary_metadata = vectors[2]['metadata']
+			assert summary_metadata['chunk_text'] == f'summary {turn}'
+			assert summary_metadata['message_index'] == str(2 * turn + 2)
+
+	stub.assert_no_pending_responses()
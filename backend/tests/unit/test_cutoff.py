@@ -0,0 +1,40 @@
+"""Unit tests for the adaptive top-k cutoff."""
+
+from rag_engine import adaptive_cutoff
+
+
+def _chunks(*distances):
+	return [{'key': str(i), 'distance': d} for i, d in enumerate(distances)]
+
+
+def test_cutoff_stops_at_largest_gap():
+	"""Tests a few strong hits followed by a jump keep only the strong hits."""
+	chunks = _chunks(0.10, 0.12, 0.13, 0.15, 0.40, 0.42, 0.45)
+
+	kept, stats = adaptive_cutoff(chunks, 2, 20, max_distance=0.6, min_gap=0.05)
+
+	assert [c['key'] for c in kept] == ['0', '1', '2', '3']
+	assert stats == {'candidates': 7, 'k': 4, 'cut': 'elbow', 'rerank_calls_avoided': 3}
+
+
+def test_cutoff_applies_distance_threshold_and_bounds():
+	"""Tests the threshold, min_k and max_k bounds."""
+	evenly_spaced = _chunks(0.1, 0.2, 0.3, 0.4, 0.5)
+	kept, stats = adaptive_cutoff(evenly_spaced, 1, 20, max_distance=0.35, min_gap=0.5)
+	assert len(kept) == 3 and stats['cut'] == 'distance'
+
+	all_weak = _chunks(0.8, 0.85, 0.9)
+	kept, stats = adaptive_cutoff(all_weak, 2, 20, max_distance=0.6, min_gap=0.05)
+	assert len(kept) == 2 and stats['cut'] == 'min_k'
+
+	kept, stats = adaptive_cutoff(evenly_spaced, 1, 2, max_distance=0.6, min_gap=0.5)
+	assert len(kept) == 2 and stats['cut'] == 'max_k'
+
+
+def test_cutoff_keeps_chunks_without_distance():
+	"""Tests lexical-only hits are not cut by the distance rules."""
+	chunks = [{'key': 'lexical'}, *_chunks(0.1, 0.9)]
+
+	kept, _ = adaptive_cutoff(chunks, 1, 20, max_distance=0.6, min_gap=0.05)
+
+	assert [c['key'] for c in kept] == ['lexical', '0']
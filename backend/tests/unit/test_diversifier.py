@@ -0,0 +1,40 @@
+"""Unit tests for MMR diversification of retrieved chunks."""
+
+from rag_engine import mmr_select
+
+
+def _chunk(key, embedding):
+	return {'key': key, 'data': {'float32': embedding}, 'metadata': {}}
+
+
+def test_mmr_skips_near_duplicates():
+	"""Tests a near-copy of the best hit loses to a distinct relevant chunk."""
+	chunks = [
+		_chunk('best', [1.0, 0.45, 0.02]),
+		_chunk('copy', [1.0, 0.4, 0.0]),
+		_chunk('other', [0.8, 0.0, 0.6]),
+	]
+
+	selected = mmr_select([1.0, 0.5, 0.0], chunks, top_k=2, lambda_mult=0.3)
+
+	assert [c['key'] for c in selected] == ['best', 'other']
+
+
+def test_mmr_with_pure_relevance_keeps_nearest():
+	"""Tests lambda 1.0 falls back to plain relevance ordering."""
+	chunks = [
+		_chunk('far', [0.0, 1.0]),
+		_chunk('near', [1.0, 0.0]),
+		_chunk('mid', [0.7, 0.7]),
+	]
+
+	selected = mmr_select([1.0, 0.0], chunks, top_k=2, lambda_mult=1.0)
+
+	assert [c['key'] for c in selected] == ['near', 'mid']
+
+
+def test_mmr_returns_small_candidate_sets_unchanged():
+	"""Tests nothing is dropped when there are at most top_k candidates."""
+	chunks = [_chunk('a', [1.0, 0.0]), {'key': 'b', 'metadata': {}}]
+
+	assert mmr_select([1.0, 0.0], chunks, top_k=5) == chunks
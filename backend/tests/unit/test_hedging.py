@@ -0,0 +1,67 @@
+"""Unit tests for hedged calls and the rerank deadline."""
+
+import threading
+import time
+
+from rag_engine.hedging import HedgeBudget, Hedger
+from rag_engine.reranker import _score_with_deadline
+
+
+def _first_call_slow():
+	calls = []
+	lock = threading.Lock()
+
+	def fn(value):
+		with lock:
+			calls.append(value)
+			first = len(calls) == 1
+		time.sleep(0.5 if first else 0.01)
+		return 'slow' if first else 'fast'
+
+	return fn, calls
+
+
+def test_slow_call_is_hedged_and_first_result_wins():
+	"""Tests a duplicate is issued after the delay and the faster one wins."""
+	fn, calls = _first_call_slow()
+	hedger = Hedger('test', HedgeBudget(ratio=1.0), max_workers=4, default_delay=0.05)
+
+	assert hedger.call(fn, 'x') == 'fast'
+	assert calls == ['x', 'x']
+	assert hedger.stats() == {'calls': 1, 'hedges': 1, 'hedge_wins': 1}
+
+
+def test_exhausted_budget_disables_hedging():
+	"""Tests no duplicate is issued once the budget is spent."""
+	fn, calls = _first_call_slow()
+	hedger = Hedger(
+		'test', HedgeBudget(ratio=0.0, burst=0.0), max_workers=4, default_delay=0.05
+	)
+
+	assert hedger.call(fn, 'x') == 'slow'
+	assert calls == ['x']
+
+
+def test_rerank_deadline_falls_back_to_distance():
+	"""Tests chunks unscored at the deadline get a distance-based score."""
+
+	def score(chunk):
+		if chunk['key'] == 'slow':
+			time.sleep(0.5)
+		chunk['metadata']['rerank_score'] = 9.0
+		return chunk
+
+	chunks = [
+		{'key': 'fast', 'distance': 0.1, 'metadata': {}},
+		{'key': 'slow', 'distance': 0.3, 'metadata': {}},
+		# Found only by lexical search, so it has no distance.
+		{'key': 'slow', 'metadata': {'rrf_score': 0.016}},
+	]
+
+	scored = _score_with_deadline(score, chunks, deadline=0.1)
+
+	assert [c['metadata']['rerank_score'] for c in scored] == [9.0, 7.0, 5.0]
+	assert 'rerank_fallback' in scored[1]['metadata']
+	assert 'rerank_fallback' in scored[2]['metadata']
+	time.sleep(0.5)
+	assert chunks[1]['metadata']['rerank_score'] == 7.0
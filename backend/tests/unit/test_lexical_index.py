@@ -0,0 +1,52 @@
+"""Unit tests for BM25 lexical search and rank fusion."""
+
+import pytest
+from rag_engine import (
+	LexicalIndex,
+	LexicalIndexStore,
+	LocalLexicalIndexStore,
+	reciprocal_rank_fusion,
+)
+
+
+def test_bm25_prefers_exact_terms():
+	"""Tests section numbers and form names are matched as whole terms."""
+	index = LexicalIndex()
+	index.add('a', 'section 4.2 covers fence height limits.')
+	index.add('b', 'section 5.1 covers pool hours and guests.')
+	index.add('c', 'submit form hoa17 before any exterior change.')
+
+	assert index.search('What does Section 4.2 say?', 1)[0][0] == 'a'
+	assert index.search('Where is Form HOA-17?', 1)[0][0] == 'c'
+	assert index.search('parking', 3) == []
+
+
+def test_lexical_index_store_requires_both_methods():
+	"""Tests a store missing part of the interface can't be created."""
+
+	class _ReadOnlyStore(LexicalIndexStore):
+		def load(self, scope):
+			return LexicalIndex()
+
+	with pytest.raises(TypeError):
+		_ReadOnlyStore()
+
+
+def test_local_store_updates_incrementally(tmp_path):
+	"""Tests each update adds to the persisted index for its scope."""
+	store = LocalLexicalIndexStore(str(tmp_path))
+	store.add_documents('private/u', {'a': 'quiet hours start at ten.'})
+	store.add_documents('private/u', {'b': 'trash pickup is on monday.'})
+
+	index = store.load('private/u')
+
+	assert set(index.doc_lengths) == {'a', 'b'}
+	assert index.search('trash monday', 1)[0][0] == 'b'
+	assert store.load('private/other').search('trash', 1) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+	"""Tests keys ranked by both lists come before single-list keys."""
+	fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['d', 'b']])
+
+	assert [key for key, _ in fused][:2] == ['b', 'a']
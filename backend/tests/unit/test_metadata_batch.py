@@ -0,0 +1,105 @@
+"""Unit tests for bulk vector metadata construction."""
+
+import pytest
+from models import BaseVectorMetadata, FileVectorMetadata, VectorMetadataBatch
+
+SHARED = {
+	'user_id': 'user-1',
+	'visibility': 'private',
+	'file_id': 'file-1',
+	'file_name': 'bylaws.pdf',
+	'file_type': 'pdf',
+	'created_at': '2026-01-01T00:00:00Z',
+}
+
+
+def test_batch_output_matches_models():
+	"""Tests batched output equals the model output, including key order."""
+	batch = VectorMetadataBatch(FileVectorMetadata, **SHARED)
+	chunks = [
+		{'chunk_text': 'first', 'chunk_hash': 'a', 'chunk_index': 0},
+		{'chunk_text': 'second', 'chunk_hash': 'b', 'chunk_index': 1, 'page_number': 2},
+		{'chunk_ref': 'private/user-1/c', 'chunk_hash': 'c', 'chunk_index': 2},
+		{'chunk_text': 'fourth', 'chunk_hash': 'd', 'chunk_index': 3},
+	]
+
+	for chunk in chunks:
+		expected = FileVectorMetadata(**SHARED, **chunk).to_s3_metadata()
+		actual = batch.to_s3_metadata(**chunk)
+		assert list(actual.items()) == list(expected.items())
+
+
+def test_batch_matches_models_across_mixed_shapes():
+	"""Tests defaults and coerced values match the model as chunk shapes vary."""
+	shared = {k: v for k, v in SHARED.items() if k != 'file_type'}
+	batch = VectorMetadataBatch(FileVectorMetadata, **shared)
+	chunks = [
+		{'source': 'file', 'file_type': 'pdf', 'chunk_text': 'a', 'page_number': 1.0},
+		{'file_type': 'pdf', 'chunk_text': 'b', 'page_number': 1.0},
+		{'file_type': 'pdf', 'chunk_text': 'c', 'page_number': 2.0},
+		{'source': 'note', 'file_type': 'md', 'chunk_text': 'd'},
+		{'file_type': 'pdf', 'chunk_text': 'e', 'page_number': '3'},
+	]
+
+	for index, chunk in enumerate(chunks):
+		expected = FileVectorMetadata(
+			**shared, **chunk, chunk_hash=chunk['chunk_text'], chunk_index=index
+		).to_s3_metadata()
+		actual = batch.to_s3_metadata(
+			**chunk, chunk_hash=chunk['chunk_text'], chunk_index=float(index)
+		)
+		assert list(actual.items()) == list(expected.items())
+
+	with pytest.raises(ValueError):
+		batch.to_s3_metadata(
+			file_type='pdf',
+			chunk_text='f',
+			chunk_hash='f',
+			chunk_index=5.0,
+			page_number=2.5,
+		)
+	with pytest.raises(ValueError):
+		batch.to_s3_metadata(
+			file_type='pdf',
+			chunk_text='g',
+			chunk_hash='g',
+			chunk_index=6.5,
+			page_number=1.0,
+		)
+
+
+def test_batch_uses_one_timestamp():
+	"""Tests every chunk in a batch shares the same created_at."""
+	batch = VectorMetadataBatch(user_id='u', visibility='private', source='file')
+	first = batch.to_s3_metadata(chunk_text='a', chunk_hash='a')
+	second = batch.to_s3_metadata(chunk_text='b', chunk_hash='b')
+	assert first['created_at'] == second['created_at']
+
+
+def test_batch_validates_shared_and_new_shapes():
+	"""Tests invalid shared fields and unseen chunk shapes are rejected."""
+	with pytest.raises(ValueError):
+		VectorMetadataBatch(visibility='private', source='file').to_s3_metadata(
+			chunk_text='a', chunk_hash='a'
+		)
+
+	batch = VectorMetadataBatch(BaseVectorMetadata, user_id='u', visibility='private')
+	batch.to_s3_metadata(source='file', chunk_text='a', chunk_hash='a')
+	with pytest.raises(ValueError):
+		batch.to_s3_metadata(source='bogus', chunk_text='b', chunk_hash='b')
+	with pytest.raises(ValueError):
+		batch.to_s3_metadata(source='file', chunk_hash='c')
+
+
+@pytest.mark.parametrize('field', ['user_id', 'tenant_id', 'visibility'])
+def test_batch_rejects_per_chunk_scope_fields(field):
+	"""Tests scope fields can't bypass validation by varying per chunk."""
+	batch = VectorMetadataBatch(visibility='private', source='file', user_id='u')
+	batch.to_s3_metadata(chunk_text='a', chunk_hash='a')
+
+	with pytest.raises(ValueError):
+		batch.to_s3_metadata(**{field: ''}, chunk_text='b', chunk_hash='b')
+
+	scoped = VectorMetadataBatch(visibility='private', source='file')
+	with pytest.raises(ValueError):
+		scoped.to_s3_metadata(user_id='u', chunk_text='a', chunk_hash='a')
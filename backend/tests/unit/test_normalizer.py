@@ -0,0 +1,103 @@
+"""Unit tests for normalization with source offsets."""
+
+import random
+import timeit
+
+import pytest
+from rag_engine import clean_data, get_chunks, get_chunks_with_offsets, normalize
+
+CASES = [
+	'',
+	'   ',
+	'Article IV. Fences',
+	'Contents . . . . . 12\nFences',
+	'fence-\n  height',
+	'a-\nb-\nc',
+	'foo- . . . 12abc',
+	'ß- \n. . . . 12. \n\nx',
+	'Pool hours (9am-9pm)!  Guests @ $5?',
+	'...  . after leader',
+	'ΟΔΟΣ İstanbul',
+]
+
+# Fragments that exercise every clean_data rule and their interactions,
+# including runs of TOC leaders long enough to expose regex backtracking.
+FRAGMENTS = ['...', '. ', '.', '12', 'fence-', '-\n', 'ab', '@', '(', ' ', '\n\n', '\t']
+LEADERS = [' . . . 1 ', '. . . . . 12\n', 'CONTENTS -\n', '-', ' ']
+
+# Hyphens followed by many leaders and no word, which once took seconds.
+SLOW_CASES = [
+	'a-' + '. . . 1 ' * 40,
+	'CONTENTS -\n' + '. . . . . N\n' * 64,
+	'CONTENTS -\n' + '. . . . . 12\n' * 64,
+]
+
+
+@pytest.mark.parametrize('text', CASES)
+def test_normalize_matches_clean_data(text):
+	"""Tests output equals clean_data on known tricky inputs."""
+	assert normalize(text)[0] == clean_data(text)
+
+
+def test_normalize_matches_clean_data_on_random_text():
+	"""Tests output equals clean_data on random mixes of edge cases."""
+	rng = random.Random(5)
+	for _ in range(2000):
+		text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 20)))
+		assert normalize(text)[0] == clean_data(text)
+
+
+def test_normalize_matches_clean_data_on_long_leader_runs():
+	"""Tests output equals clean_data when TOC leaders repeat many times."""
+	rng = random.Random(7)
+	for _ in range(300):
+		text = ''.join(
+			rng.choice(LEADERS + FRAGMENTS) for _ in range(rng.randint(20, 80))
+		)
+		assert normalize(text)[0] == clean_data(text)
+	for text in SLOW_CASES:
+		assert normalize(text * 20)[0] == clean_data(text * 20)
+
+
+def _seconds(fn, text: str) -> float:
+	return min(timeit.repeat(lambda: fn(text), number=1, repeat=3))
+
+
+@pytest.mark.parametrize('text', SLOW_CASES, ids=['hyphen', 'letters', 'numbers'])
+@pytest.mark.parametrize(
+	'fn', [lambda t: normalize(t)[0], get_chunks], ids=['normalize', 'get_chunks']
+)
+def test_time_is_linear_on_leader_runs(text, fn):
+	"""Tests hyphens before long leader runs can't make matching backtrack."""
+	# Four times the input takes about four times as long when matching is
+	# linear, and sixteen times when it is quadratic.
+	assert _seconds(fn, text * 160) < 8 * _seconds(fn, text * 40)
+
+
+def test_offsets_point_at_source_characters():
+	"""Tests kept characters map to the source characters they came from."""
+	text = 'Section 4.2 . . . . 7\n\nFENCE-\n  HEIGHT (max) limits'
+	cleaned, offsets = normalize(text)
+
+	assert cleaned == 'section 4.2 fenceheight max limits'
+	for index, character in enumerate(cleaned):
+		if character != ' ':
+			assert text[offsets.to_source(index)].lower() == character
+	assert offsets.source_span(12, 23) == (23, 38)
+	with pytest.raises(IndexError):
+		offsets.to_source(len(cleaned))
+
+
+def test_chunks_carry_source_spans():
+	"""Tests chunk spans are ordered and locate the chunk text in the source."""
+	text = '\n\n'.join(
+		f'Rule {i}. Owners must keep lawns under six inches.' for i in range(60)
+	)
+	chunks = get_chunks_with_offsets(text)
+
+	assert len(chunks) > 1
+	previous_end = 0
+	for chunk, source_start, source_end in chunks:
+		assert previous_end <= source_start < source_end
+		assert clean_data(text[source_start:source_end]) == chunk.text.strip()
+		previous_end = source_end
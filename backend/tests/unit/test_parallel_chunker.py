@@ -0,0 +1,50 @@
+"""Unit tests for process-pool chunking."""
+
+import random
+
+from rag_engine import ChunkingPool, clean_data, get_chunks, split_paragraphs
+
+# Fragments that exercise every clean_data rule, including around breaks.
+FRAGMENTS = [
+	'Section 4.2',
+	'fence-',
+	'height',
+	'. . . . 12',
+	'Pool hours (9am-9pm)!',
+	'guests @ $5?',
+	'ΟΔΟΣ',
+	'3.',
+	'-',
+	'\n\n',
+	'\n \n\t',
+	' ',
+]
+
+
+def _random_text(rng: random.Random, size: int) -> str:
+	return ' '.join(rng.choice(FRAGMENTS) for _ in range(size))
+
+
+def _as_tuples(chunks) -> list[tuple]:
+	return [(c.text, c.start_index, c.end_index, c.token_count) for c in chunks]
+
+
+def test_split_pieces_clean_like_whole_text():
+	"""Tests cleaning pieces and joining them matches clean_data."""
+	rng = random.Random(7)
+	for _ in range(200):
+		text = _random_text(rng, 60)
+		pieces = split_paragraphs(text, 1)
+		cleaned = ' '.join(filter(None, (clean_data(p) for p in pieces)))
+		assert cleaned == clean_data(text)
+
+
+def test_pool_matches_serial_chunks_in_order():
+	"""Tests streamed results equal get_chunks, for small and split documents."""
+	rng = random.Random(11)
+	texts = [_random_text(rng, rng.randint(0, 2000)) for _ in range(12)]
+
+	with ChunkingPool(max_workers=2, split_chars=500, window=3) as pool:
+		results = list(pool.chunk_documents(iter(texts)))
+
+	assert [_as_tuples(r) for r in results] == [_as_tuples(get_chunks(t)) for t in texts]
@@ -0,0 +1,82 @@
+"""Unit tests for sampled handler profiling."""
+
+import concurrent.futures
+import json
+import pstats
+import sys
+
+import pytest
+from rag_engine import Config, profile_handler
+
+
+def _busy_scoring(n):
+	return sum(i * i for i in range(n))
+
+
+def _handler(event, context):
+	with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+		scores = list(executor.map(_busy_scoring, [20000] * 4))
+	return {'statusCode': 200, 'body': json.dumps(scores), 'blob': 'x' * 200000}
+
+
+def _printed_profile(capsys) -> dict:
+	lines = capsys.readouterr().out.splitlines()
+	return json.loads(lines[-1])['profile']
+
+
+def test_disabled_profiling_returns_handler_unchanged(monkeypatch):
+	"""Tests a zero sample rate adds no wrapper at all."""
+	monkeypatch.setattr(Config, 'PROFILE_SAMPLE_RATE', 0.0)
+
+	assert profile_handler(_handler) is _handler
+
+
+def test_sampled_invocation_prints_summary_and_writes_dumps(
+	monkeypatch, tmp_path, capsys
+):
+	"""Tests the summary covers pool threads and full dumps are loadable."""
+	monkeypatch.setattr(Config, 'PROFILE_SAMPLE_RATE', 1.0)
+	monkeypatch.setattr(Config, 'PROFILE_TOP_N', 50)
+	monkeypatch.setattr(Config, 'PROFILE_PATH', str(tmp_path))
+
+	response = profile_handler(_handler)({}, None)
+	profile = _printed_profile(capsys)
+
+	assert response['statusCode'] == 200
+	assert any('_busy_scoring' in row[0] for row in profile['top_cumulative_time'])
+	assert sum(row[1] for row in profile['top_allocations_kb']) >= 195
+	stats = pstats.Stats(f'{profile["dump"]}.prof')
+	assert any(name == '_busy_scoring' for _, _, name in stats.stats)
+	assert (tmp_path / f'{profile["dump"]}.tracemalloc').exists()
+
+
+def test_failed_invocation_is_still_profiled(monkeypatch, capsys):
+	"""Tests handler errors propagate after the summary is printed."""
+	monkeypatch.setattr(Config, 'PROFILE_SAMPLE_RATE', 1.0)
+	monkeypatch.setattr(Config, 'PROFILE_PATH', None)
+
+	def _failing_handler(event, context):
+		raise ValueError('bad event')
+
+	with pytest.raises(ValueError):
+		profile_handler(_failing_handler)({}, None)
+
+	assert _printed_profile(capsys)['handler'].endswith('_failing_handler')
+
+
+def test_pool_threads_stop_profiling_after_the_invocation(monkeypatch, capsys):
+	"""Tests threads of a long-lived pool don't stay profiled."""
+	monkeypatch.setattr(Config, 'PROFILE_SAMPLE_RATE', 1.0)
+	monkeypatch.setattr(Config, 'PROFILE_PATH', None)
+
+	with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+
+		def _pooled_handler(event, context):
+			# The pool's thread is started during the invocation.
+			return executor.submit(_busy_scoring, 20000).result()
+
+		profile_handler(_pooled_handler)({}, None)
+		profile = _printed_profile(capsys)
+
+		assert any('_busy_scoring' in row[0] for row in profile['top_cumulative_time'])
+		assert executor.submit(sys.getprofile).result() is None
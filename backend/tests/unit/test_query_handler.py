@@ -0,0 +1,111 @@
+"""Unit tests for the query handler's vector store calls and conversations."""
+
+import importlib.util
+import json
+import os
+
+import pytest
+from botocore.stub import Stubber
+from clients.factory import get_s3_vector_client
+from rag_engine import Config
+
+HANDLER_PATH = os.path.join(
+	os.path.dirname(__file__), '..', '..', 'main', 'handlers', 'query', 'handler.py'
+)
+
+EVENT = {
+	'requestContext': {'authorizer': {'claims': {'sub': 'resident-1'}}},
+	'body': json.dumps({'query': 'What are the pool hours?'}),
+}
+
+
+@pytest.fixture
+def handler(monkeypatch):
+	"""Load the query handler with Bedrock calls replaced by fakes."""
+	spec = importlib.util.spec_from_file_location('query_handler', HANDLER_PATH)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+
+	monkeypatch.setattr(module, 'get_embedding', lambda text: [1.0, 0.0])
+	monkeypatch.setattr(module, 'rerank_chunks', lambda query, chunks: chunks)
+	monkeypatch.setattr(
+		module, 'generate_answer', lambda query, chunks, **kwargs: 'Pool opens at 9am.'
+	)
+	return module
+
+
+def _query_response():
+	return {
+		'vectors': [
+			{'key': 'a', 'distance': 0.1, 'metadata': {'chunk_text': 'pool hours'}},
+			{'key': 'b', 'distance': 0.2, 'metadata': {'chunk_text': 'guest fees'}},
+		],
+		'distanceMetric': 'cosine',
+	}
+
+
+def test_query_leaves_out_embeddings_without_mmr(handler, monkeypatch):
+	"""Tests a query makes a single query_vectors call when MMR is off."""
+	monkeypatch.setattr(Config, 'MMR_ENABLED', False)
+
+	with Stubber(get_s3_vector_client()) as stub:
+		stub.add_response('query_vectors', _query_response())
+		response = handler.lambda_handler(EVENT, None)
+		stub.assert_no_pending_responses()
+
+	assert json.loads(response['body'])['answer'] == 'Pool opens at 9am.'
+
+
+def test_query_fetches_embeddings_by_key_for_mmr(handler, monkeypatch):
+	"""Tests MMR embeddings come from get_vectors, as query_vectors can't return them."""
+	monkeypatch.setattr(Config, 'MMR_ENABLED', True)
+
+	with Stubber(get_s3_vector_client()) as stub:
+		stub.add_response('query_vectors', _query_response())
+		stub.add_response(
+			'get_vectors',
+			{
+				'vectors': [
+					{'key': 'b', 'data': {'float32': [0.0, 1.0]}},
+					{'key': 'a', 'data': {'float32': [1.0, 0.0]}},
+				]
+			},
+			expected_params={
+				'vectorBucketName': Config.VECTOR_BUCKET,
+				'indexName': Config.VECTOR_INDEX,
+				'keys': ['a', 'b'],
+				'returnData': True,
+				'returnMetadata': False,
+			},
+		)
+		response = handler.lambda_handler(EVENT, None)
+		stub.assert_no_pending_responses()
+
+	assert json.loads(response['body'])['answer'] == 'Pool opens at 9am.'
+
+
+def test_unanswered_follow_up_is_saved_with_its_chat_id(handler, monkeypatch):
+	"""Tests a follow-up with no matching documents is still stored and returned."""
+	monkeypatch.setattr(Config, 'MMR_ENABLED', False)
+	conversation = {'chat_id': 'chat-1', 'summary': '', 'message_count': 0, 'turns': []}
+	monkeypatch.setattr(
+		handler, 'load_conversation', lambda chat_id, user_id, embedding: conversation
+	)
+	saved = []
+	monkeypatch.setattr(handler, 'save_exchange', lambda *args: saved.append(args))
+	event = {
+		**EVENT,
+		'body': json.dumps({'query': 'And on holidays?', 'chat_id': 'chat-1'}),
+	}
+
+	with Stubber(get_s3_vector_client()) as stub:
+		stub.add_response('query_vectors', {'vectors': [], 'distanceMetric': 'cosine'})
+		response = handler.lambda_handler(event, None)
+
+	assert json.loads(response['body']) == {
+		'answer': handler.NO_ANSWER,
+		'chat_id': 'chat-1',
+	}
+	assert saved == [
+		(conversation, 'resident-1', 'And on holidays?', [1.0, 0.0], handler.NO_ANSWER)
+	]
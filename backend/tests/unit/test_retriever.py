@@ -0,0 +1,70 @@
+"""Unit tests for candidate retrieval."""
+
+from botocore.stub import Stubber
+from rag_engine import LocalLexicalIndexStore, retriever
+
+
+def _query_response():
+	return {
+		'vectors': [
+			{'key': 'a', 'distance': 0.1, 'metadata': {'chunk_text': 'pool hours'}},
+			{'key': 'b', 'distance': 0.2, 'metadata': {'chunk_text': 'fence rules'}},
+		],
+		'distanceMetric': 'cosine',
+	}
+
+
+def test_vector_search_leaves_out_embeddings_by_default():
+	"""Tests a plain vector search makes a single query_vectors call."""
+	with Stubber(retriever.s3vector_client) as stub:
+		stub.add_response('query_vectors', _query_response())
+
+		vectors = retriever.retrieve_candidates('q', [0.1], {}, scope='private#u')
+
+	assert [v['key'] for v in vectors] == ['a', 'b']
+	assert 'data' not in vectors[0]
+
+
+def test_vector_search_fetches_embeddings_by_key():
+	"""Tests embeddings come from get_vectors, as query_vectors can't return them."""
+	with Stubber(retriever.s3vector_client) as stub:
+		stub.add_response('query_vectors', _query_response())
+		stub.add_response(
+			'get_vectors',
+			{
+				'vectors': [
+					{'key': 'b', 'data': {'float32': [0.2]}},
+					{'key': 'a', 'data': {'float32': [0.1]}},
+				]
+			},
+			expected_params={
+				'vectorBucketName': retriever.Config.VECTOR_BUCKET,
+				'indexName': retriever.Config.VECTOR_INDEX,
+				'keys': ['a', 'b'],
+				'returnData': True,
+				'returnMetadata': False,
+			},
+		)
+
+		vectors = retriever.retrieve_candidates(
+			'q', [0.1], {}, scope='private#u', return_data=True
+		)
+
+	assert [v['data']['float32'] for v in vectors] == [[0.1], [0.2]]
+	assert vectors[0]['metadata']['chunk_text'] == 'pool hours'
+
+
+def test_hybrid_search_keeps_requested_candidate_count(tmp_path, monkeypatch):
+	"""Tests the fused list isn't cut below the caller's top_k."""
+	monkeypatch.setattr(retriever.Config, 'HYBRID_TOP_K', 1)
+	store = LocalLexicalIndexStore(str(tmp_path))
+	store.add_documents('private/u', {'b': 'fence rules'})
+
+	with Stubber(retriever.s3vector_client) as stub:
+		stub.add_response('query_vectors', _query_response())
+
+		vectors = retriever.retrieve_candidates(
+			'fence', [0.1], {}, scope='private/u', lexical_store=store, top_k=2
+		)
+
+	assert [v['key'] for v in vectors] == ['b', 'a']
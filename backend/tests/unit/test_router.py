@@ -0,0 +1,44 @@
+"""Unit tests for generation model routing."""
+
+import pytest
+from rag_engine import Config
+from rag_engine.router import route_generation
+
+
+def _chunk(text, score):
+	return {'metadata': {'chunk_text': text, 'rerank_score': score}}
+
+
+@pytest.fixture
+def routing(monkeypatch):
+	"""Enable routing with known thresholds."""
+	monkeypatch.setattr(Config, 'ROUTING_ENABLED', True)
+	monkeypatch.setattr(Config, 'ROUTING_MAX_CONTEXT_CHARS', 100)
+	monkeypatch.setattr(Config, 'ROUTING_MIN_TOP_SCORE', 8)
+	monkeypatch.setattr(Config, 'ROUTING_MIN_SCORE_GAP', 2)
+
+
+def test_decisive_small_context_uses_fast_model(routing):
+	"""Tests one clear winner in a small context routes to the fast model."""
+	route = route_generation([_chunk('pool closes at 10pm.', 9), _chunk('x', 5)])
+
+	assert route['model'] == Config.FAST_GENERATION_MODEL
+	assert route['max_tokens'] == Config.FAST_GENERATION_MAX_TOKENS
+	assert route['reason'] == 'decisive_small_context'
+
+
+@pytest.mark.parametrize(
+	('chunks', 'reason'),
+	[
+		([_chunk('x' * 200, 9)], 'large_context'),
+		([_chunk('short', 6)], 'weak_top_score'),
+		([_chunk('a', 9), _chunk('b', 8)], 'multi_source'),
+	],
+)
+def test_other_contexts_use_default_model(routing, chunks, reason):
+	"""Tests large, weak or multi-source contexts keep the default model."""
+	route = route_generation(chunks)
+
+	assert route['model'] == Config.GENERATION_MODEL
+	assert route['max_tokens'] == Config.GENERATION_MAX_TOKENS
+	assert route['reason'] == reason
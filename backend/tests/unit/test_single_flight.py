@@ -0,0 +1,51 @@
+"""Unit tests for single-flight request coalescing."""
+
+import concurrent.futures
+import threading
+
+import pytest
+from rag_engine.single_flight import SingleFlight
+
+
+def _concurrent_calls(group, key, fn, callers):
+	with concurrent.futures.ThreadPoolExecutor(max_workers=callers) as executor:
+		futures = [executor.submit(group.do, key, fn) for _ in range(callers)]
+		return [f.exception() or f.result() for f in futures]
+
+
+def test_concurrent_callers_share_one_call():
+	"""Tests callers with the same key share the in-flight result."""
+	group = SingleFlight('test')
+	release = threading.Event()
+	calls = []
+
+	def fn():
+		calls.append(1)
+		release.wait(1)
+		return 'result'
+
+	timer = threading.Timer(0.1, release.set)
+	timer.start()
+	results = _concurrent_calls(group, 'key', fn, callers=5)
+
+	assert results == ['result'] * 5
+	assert len(calls) == 1
+	assert group.stats() == {'calls': 5, 'coalesced': 4}
+
+
+def test_errors_are_shared_and_not_cached():
+	"""Tests waiters see the leader's error and later calls retry."""
+	group = SingleFlight('test')
+	release = threading.Event()
+
+	def failing():
+		release.wait(1)
+		raise RuntimeError('throttled')
+
+	threading.Timer(0.1, release.set).start()
+	results = _concurrent_calls(group, 'key', failing, callers=3)
+
+	assert all(isinstance(r, RuntimeError) for r in results)
+	assert group.do('key', lambda: 'recovered') == 'recovered'
+	with pytest.raises(ValueError):
+		group.do('other', int, 'not a number')